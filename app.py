@@ -3,10 +3,15 @@ import pandas as pd
 import numpy as np
 import altair as alt
 
-import vl_convert as vlc
-
+import argparse
 from pathlib import Path
-from typing import List
+from datetime import datetime
+from typing import Optional, Tuple
+
+from src.constants import ARTIFACTS_ROOT, DASHBOARD_DATABASE_PATH, DASHBOARD_MANIFEST_PATH, PREPARED_DATA_PATH
+from src.pipeline.dashboard_metrics import DashboardMetrics
+from src.pipeline.artifact_manifest import ArtifactReloader, read_manifest
+from src.utils.common import to_month_period, rebase_artifact_path
 
 # set locale to pt-BR
 import locale
@@ -16,8 +21,26 @@ locale.setlocale(locale.LC_ALL, 'pt_BR.utf-8')
 import logging
 logging.getLogger().addHandler(logging.NullHandler())
 
+def get_artifacts_root() -> Path:
+    # artifacts of a sample run are shown with: streamlit run app.py -- --artifacts-root artifacts_sample
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--artifacts-root', type=Path, default=ARTIFACTS_ROOT)
+    return parser.parse_known_args()[0].artifacts_root
+
+DATABASE_PATH = rebase_artifact_path(DASHBOARD_DATABASE_PATH, get_artifacts_root())
+MANIFEST_PATH = rebase_artifact_path(DASHBOARD_MANIFEST_PATH, get_artifacts_root())
+DATASET_PATH = rebase_artifact_path(PREPARED_DATA_PATH, get_artifacts_root())
+
+# max dataset versions of the charts kept in memory, shared by all sessions
+METRICS_CACHE_MAX_ENTRIES = 2
+
+# seconds between checks for a new version of the data while the page is open
+RELOAD_CHECK_INTERVAL = 30
+
+# max chart specs kept in memory, one per dataset version and selected period
+CHART_CACHE_MAX_ENTRIES = 64
+
 # model
-@st.cache_data
 def load_dataset(path: Path) -> pd.DataFrame:
     df = pd.read_csv(path)
 
@@ -26,94 +49,62 @@ def load_dataset(path: Path) -> pd.DataFrame:
         if column.endswith(('_date', '_timestamp')):
             df[column] = pd.to_datetime(df[column])
 
-    return df
-
-@st.cache_data
-def extract_purchase_dates(data: pd.DataFrame) -> pd.Series:
-    timestamps = data.order_purchase_timestamp.dt.to_period('M').copy()
-    timestamps = timestamps.sort_values()
-    timestamps = timestamps.dt.strftime('%B %Y')
-    timestamps = timestamps.drop_duplicates()
-
-    return timestamps
-
-def extract_orders_delivery_stats(data: pd.DataFrame) -> pd.DataFrame:
-    # load orders delivery infos
-    order_delivery_info = data[
-        ['order_id', 'order_status', 'order_purchase_timestamp', 'order_delivered_customer_date', 'order_estimated_delivery_date']
-    ].copy()
-    order_delivery_info.drop_duplicates(subset=['order_id'], inplace=True)
-    order_delivery_info.drop('order_id', axis=1, inplace=True)
-    order_delivery_info.columns = ['status', 'purchase_date', 'delivery_date', 'estimated_date']
-
-    return order_delivery_info
-
-@st.cache_data
-def extract_orders_volume(data: pd.DataFrame) -> pd.DataFrame:
-    # count orders per period
-    orders_volume = pd.DataFrame({ 'volume' : range(data.shape[0]) })
-    orders_volume = orders_volume.groupby([data.order_purchase_timestamp.dt.strftime('%m %Y')]).size().reset_index()
-    orders_volume.rename({ 'order_purchase_timestamp' : 'date', 0 : 'volume' }, axis=1, inplace=True)
-
-    orders_volume.date = pd.to_datetime(orders_volume.date, format='%m %Y') + pd.offsets.MonthEnd(0)
-
-    return orders_volume
-
-@st.cache_data
-def extract_order_delivery_details(data: pd.DataFrame, selected_period: str) -> List[int]:
-    orders_volume = extract_orders_volume(data)
-    orders_stats = extract_orders_delivery_stats(data)
-
-    if selected_period != 'todo':
-        orders_volume = orders_volume[orders_volume.date.dt.strftime('%B %Y') == selected_period]
-        orders_stats = orders_stats[orders_stats.purchase_date.dt.strftime('%B %Y') == selected_period]
+    # integer purchase period (year * 12 + month - 1)
+    if 'purchase_period' not in df.columns:
+        df['purchase_period'] = to_month_period(df.order_purchase_timestamp)
 
-    orders_count = 0
-    orders_pendent = 0
-    orders_delivered = 0
-    orders_late = 0
-    orders_avarage_late_delivery_time = 0
+    return df
 
-    deliverd_orders = orders_stats[orders_stats.status == 'delivered']
-    late_orders = orders_stats[orders_stats.delivery_date.dt.to_period('D') > orders_stats.estimated_date.dt.to_period('D')]
+def get_data_version(path: Path) -> str:
+    # identifies the file content without reading it
+    stat = path.stat()
+    return f'{stat.st_mtime_ns}-{stat.st_size}'
 
-    orders_count = orders_volume.volume.sum()
-    orders_delivered = deliverd_orders.shape[0]
-    orders_pendent = orders_count - orders_delivered
-    orders_late = late_orders.shape[0]
-    orders_avarage_late_delivery_time = (late_orders.delivery_date - late_orders.estimated_date).dt.days.mean()
+def resolve_data() -> Tuple[str, Path]:
+    # version written by the pipeline, or metrics computed once from the prepared dataset
+    manifest = read_manifest(MANIFEST_PATH)
+    if manifest is not None:
+        return manifest
 
-    if orders_avarage_late_delivery_time is np.nan:
-        orders_avarage_late_delivery_time = 0
-    else:
-        orders_avarage_late_delivery_time = int(orders_avarage_late_delivery_time)
+    data_path = DATABASE_PATH if DATABASE_PATH.exists() else DATASET_PATH
+    return get_data_version(data_path), data_path
 
-    return [orders_count, orders_pendent, orders_delivered, orders_late, orders_avarage_late_delivery_time]
+def load_metrics(path: Path) -> DashboardMetrics:
+    if path.suffix == DATABASE_PATH.suffix:
+        return DashboardMetrics.from_database(path)
 
-@st.cache_data
-def extract_scores_mean(data: pd.DataFrame, selected_period: str) -> float:
-    orders = data
-    if selected_period != 'todo':
-        orders=orders[orders.order_purchase_timestamp.dt.strftime('%B %Y') == selected_period]
+    return DashboardMetrics.from_dataset(load_dataset(path))
 
-    return orders.review_score.mean()
+def release_charts(version: str):
+    # chart specs inline the data of their version, cleared so the swapped out version is released
+    get_order_volume_chart.clear()
+    get_order_volume_spec.clear()
 
-@st.cache_data
-def count_reviews_topic(data: pd.DataFrame, selected_period: str) -> List[str]:
-    orders = data
-    if selected_period != 'todo':
-        orders=orders[orders.order_purchase_timestamp.dt.strftime('%B %Y') == selected_period]
+@st.cache_resource
+def get_metrics_reloader() -> ArtifactReloader:
+    # shared by all sessions, new versions are loaded in background and swapped in when ready
+    return ArtifactReloader(load_metrics, resolve_data, on_swap=release_charts)
 
-    topics = orders.complaint.to_list()
+def format_period(period: int) -> str:
+    return datetime(period // 12, period % 12 + 1, 1).strftime('%B %Y').capitalize()
 
-    product_topic_count = topics.count('Product')
-    delivery_topic_count = topics.count('Delivery')
+# view
+@st.cache_resource
+def get_chart_locale() -> dict:
+    # imported once, just to read the chart locales
+    import vl_convert as vlc
 
-    return product_topic_count, delivery_topic_count
+    return {
+        "embedOptions": {
+            "formatLocale": vlc.get_format_locale('pt-BR'),
+            "timeFormatLocale": vlc.get_time_format_locale('pt-BR')
+        }
+    }
 
-# view
-def plot_order_volume(data: pd.DataFrame, selected_period: str):
-    orders_volume = extract_orders_volume(data)
+@st.cache_resource(max_entries=METRICS_CACHE_MAX_ENTRIES)
+def get_order_volume_chart(_data: DashboardMetrics, version: str) -> alt.Chart:
+    # send just the monthly aggregate
+    orders_volume = _data.orders_volume()[['date', 'volume']]
 
     # line plot
     chart = alt.Chart(orders_volume).mark_line(
@@ -127,10 +118,18 @@ def plot_order_volume(data: pd.DataFrame, selected_period: str):
         ]
     ).interactive(bind_y=False)
 
-    present_chart = chart
+    return chart
+
+# cache_data, each rerun gets its own copy of the spec instead of the dict shared by all sessions
+@st.cache_data(max_entries=CHART_CACHE_MAX_ENTRIES)
+def get_order_volume_spec(_data: DashboardMetrics, version: str, selected_period: Optional[int]) -> dict:
+    orders_volume = _data.orders_volume()
 
-    if selected_period != 'todo':
-        selected_df = orders_volume[orders_volume.date.dt.strftime('%B %Y') == selected_period].copy()
+    # base chart is built once per version, just the selection overlay depends on the period
+    present_chart = get_order_volume_chart(_data, version)
+
+    if selected_period is not None:
+        selected_df = orders_volume.loc[orders_volume.period == selected_period, ['date', 'volume']]
 
         selection_rule = alt.Chart(selected_df).mark_rule(
             color='#F97',
@@ -156,27 +155,28 @@ def plot_order_volume(data: pd.DataFrame, selected_period: str):
             ]
         )
 
-        present_chart = chart + selection_rule + selection_point
+        present_chart = present_chart + selection_rule + selection_point
 
-    present_chart['usermeta'] = {
-        "embedOptions": {
-            "formatLocale": vlc.get_format_locale('pt-BR'),
-            "timeFormatLocale": vlc.get_time_format_locale('pt-BR')
-        }
-    }
+    spec = present_chart.to_dict()
+    spec['usermeta'] = get_chart_locale()
 
-    st.altair_chart(present_chart, use_container_width=True)
+    return spec
 
-def date_selection(data: pd.DataFrame):
-    dates = extract_purchase_dates(data)
+def plot_order_volume(data: DashboardMetrics, version: str, selected_period: Optional[int]):
+    st.vega_lite_chart(get_order_volume_spec(data, version, selected_period), use_container_width=True)
 
+def date_selection(data: DashboardMetrics) -> Optional[int]:
+    periods = data.purchase_periods()
+
+    # None selects the whole dataset, just the labels are formatted with the locale
     selection = st.selectbox(
         "Período",
-        tuple(['Todo'] + list(map(lambda date: date.capitalize(), dates.to_list()))),
-        0
+        tuple([None] + periods),
+        0,
+        format_func=lambda period: 'Todo' if period is None else format_period(period)
     )
 
-    return selection.lower()
+    return selection
 
 def format_value_to_readable_format(value: int) -> str:
     if value < 10**3:
@@ -187,7 +187,7 @@ def format_value_to_readable_format(value: int) -> str:
     
     return f'{value / 10**6:.1f} mi'
 
-def show_metrics(data: pd.DataFrame, selected_period: str):
+def show_metrics(data: DashboardMetrics, selected_period: Optional[int]):
 
     # extract metrics
     [
@@ -196,7 +196,7 @@ def show_metrics(data: pd.DataFrame, selected_period: str):
         orders_delivered,
         orders_late,
         orders_avarage_late_delivery_time
-    ] = extract_order_delivery_details(data, selected_period)
+    ] = data.order_delivery_details(selected_period)
 
     # format values
     orders_count = format_value_to_readable_format(orders_count)
@@ -214,11 +214,11 @@ def show_metrics(data: pd.DataFrame, selected_period: str):
     col4.metric(':blue[Atrasados]', value=orders_late)
     col5.metric(':blue[Média de atraso]', value=orders_avarage_late_delivery_time)
 
-def show_review_analysis_panel(data: pd.DataFrame, selected_period: str):
-    mean_score = extract_scores_mean(data, selected_period)
+def show_review_analysis_panel(data: DashboardMetrics, selected_period: Optional[int]):
+    mean_score = data.scores_mean(selected_period)
     satisfaction_percentage = 100 * (mean_score - 1) / 4
 
-    product_reclamation, delivery_reclamation = count_reviews_topic(data, selected_period)
+    product_reclamation, delivery_reclamation = data.count_reviews_topic(selected_period)
 
     st.markdown('<h2 style=\'text-align: center; white-space: nowrap; font-size: 2vw;\'>Satisfação dos Compradores</h2>', unsafe_allow_html=True)
 
@@ -236,6 +236,12 @@ def show_review_analysis_panel(data: pd.DataFrame, selected_period: str):
     c1.metric('Reclamação de produtos', product_reclamation)
     c2.metric('Reclamação de entregas', delivery_reclamation)
 
+@st.fragment(run_every=RELOAD_CHECK_INTERVAL)
+def watch_data_version(shown_version: str):
+    # reruns the page once a new version of the data is swapped in, without blocking on its load
+    if get_metrics_reloader().get()[0] != shown_version:
+        st.rerun()
+
 def main_page():
     st.set_page_config(
         page_title='E-Commerce Dashboard',
@@ -245,7 +251,8 @@ def main_page():
 
     st.markdown('# 📶E-Commerce Brasileiro')
 
-    data = load_dataset(Path('artifacts/data_preprocessing/data.csv'))
+    data_version, data = get_metrics_reloader().get()
+    watch_data_version(data_version)
 
     selected_period = date_selection(data)
     st.markdown('#####')
@@ -256,7 +263,7 @@ def main_page():
 
         st.markdown('###')
 
-        plot_order_volume(data, selected_period)
+        plot_order_volume(data, data_version, selected_period)
 
     with col2:
         show_review_analysis_panel(data, selected_period)
@@ -0,0 +1,60 @@
+'''
+Size of the orders volume chart of the dashboard: the Vega-Lite spec with its data inlined as
+JSON by Altair, and what st.vega_lite_chart sends to the browser, the spec without the data
+plus the data as Arrow.
+
+Usage: python benchmarks/chart_spec_size.py [--database <dashboard database, the one of artifacts/dashboard/manifest.json by default>]
+'''
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import altair as alt
+import vl_convert as vlc
+import pandas as pd
+from streamlit import dataframe_util
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.constants import DASHBOARD_MANIFEST_PATH
+from src.pipeline.artifact_manifest import read_manifest
+from src.pipeline.dashboard_metrics import DashboardMetrics
+
+def json_size(obj) -> int:
+    return len(json.dumps(obj).encode('utf-8'))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', type=Path, default=None)
+    args = parser.parse_args()
+
+    database = args.database or read_manifest(DASHBOARD_MANIFEST_PATH)[1]
+    orders_volume = DashboardMetrics.from_database(database).orders_volume()[['date', 'volume']]
+
+    # same encodings as the chart of app.py
+    spec = alt.Chart(orders_volume).mark_line(strokeWidth=6).encode(
+        x=alt.X('date:T', axis=alt.Axis(title='', format='%B %Y', labelFontSize=13)),
+        y=alt.Y('volume:Q', axis=alt.Axis(title='Quantidade de pedidos', titleFontSize=18, labelFontSize=13)),
+        tooltip=[
+            alt.Tooltip('date:T', title='Data', format='%B %Y'),
+            alt.Tooltip('volume:Q', title='Volume')
+        ]
+    ).interactive(bind_y=False).to_dict()
+
+    spec['usermeta'] = {
+        'embedOptions': {
+            'formatLocale': vlc.get_format_locale('pt-BR'),
+            'timeFormatLocale': vlc.get_time_format_locale('pt-BR')
+        }
+    }
+
+    datasets = spec.pop('datasets')
+    arrow_size = sum(len(dataframe_util.convert_anything_to_arrow_bytes(pd.DataFrame(values))) for values in datasets.values())
+
+    print(f'months: {orders_volume.shape[0]}')
+    print(f'spec with inlined data: {json_size(spec) + json_size(datasets)} bytes ({json_size(datasets)} of data)')
+    print(f'sent to the browser: {json_size(spec)} bytes of spec + {arrow_size} bytes of Arrow data')
+
+if __name__ == '__main__':
+    main()
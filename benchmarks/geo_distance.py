@@ -0,0 +1,63 @@
+'''
+Throughput of the customer to seller distance of every order item, row-wise apply against
+the vectorized haversine_km, and of the seller index build and nearest-seller queries.
+
+Usage: python benchmarks/geo_distance.py [--source-data artifacts/data_ingestion/data.csv] [--scale 1]
+'''
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.components.geo_features import GeoFeatures
+from src.entity.config_entity import GeoFeaturesConfig
+from src.pipeline.geo import EARTH_RADIUS_KM, SellerIndex, haversine_km
+
+def haversine_row(row: pd.Series) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, [row.mean_lat_costumer, row.mean_lon_costumer, row.mean_lat_seller, row.mean_lon_seller])
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max(a, 0), 1)))
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source-data', default='artifacts/data_ingestion/data.csv')
+    parser.add_argument('--scale', type=int, default=1, help='times the order items are replicated.')
+    parser.add_argument('--apply-rows', type=int, default=100000, help='max rows of the row-wise apply.')
+    args = parser.parse_args()
+
+    config = GeoFeaturesConfig('', '', '', args.source_data, 'flat', '')
+    items = GeoFeatures(config).load_order_items()
+    items = pd.concat([items] * args.scale, ignore_index=True)
+    n_items = items.shape[0]
+
+    apply_items = items.iloc[:args.apply_rows]
+    apply_distances, apply_time = timed(lambda: apply_items.apply(haversine_row, axis=1).to_numpy())
+
+    distances, vectorized_time = timed(lambda: haversine_km(
+        items.mean_lat_costumer, items.mean_lon_costumer, items.mean_lat_seller, items.mean_lon_seller))
+
+    max_diff = np.nanmax(np.abs(apply_distances - distances[:apply_items.shape[0]])) if apply_items.shape[0] else 0.0
+
+    seller_index, build_time = timed(lambda: SellerIndex.build(items))
+
+    customers = items[['mean_lat_costumer', 'mean_lon_costumer']].dropna()
+    _, query_time = timed(lambda: seller_index.query_nearest(customers.mean_lat_costumer, customers.mean_lon_costumer, k=5))
+
+    print(f'order items: {n_items}, seller locations: {seller_index.centroids.shape[0]}')
+    print(f'row-wise apply: {apply_items.shape[0] / apply_time:>14,.0f} items/s ({apply_items.shape[0]} items)')
+    print(f'vectorized:     {n_items / vectorized_time:>14,.0f} items/s, speedup {(apply_time / apply_items.shape[0]) / (vectorized_time / n_items):.0f}x, max diff {max_diff:.1e} km')
+    print(f'index build: {build_time:.3f}s, 5 nearest locations of {customers.shape[0]} customers: {customers.shape[0] / query_time:,.0f} queries/s')
+
+if __name__ == '__main__':
+    main()
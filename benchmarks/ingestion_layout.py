@@ -0,0 +1,60 @@
+'''
+Compare the flat and star data ingestion layouts: output size, ingestion time and
+the time to load the orders delivery information used by the dashboard.
+
+Usage: python benchmarks/ingestion_layout.py [--source-dir datasets]
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.components.data_ingestion import DataIngestion
+from src.constants import STAR_ORDERS_FILENAME
+from src.entity.config_entity import DataIngestionConfig
+
+DELIVERY_COLUMNS = ['order_id', 'order_status', 'order_purchase_timestamp', 'order_delivered_customer_date', 'order_estimated_delivery_date']
+
+def directory_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in Path(path).rglob('*') if file.is_file())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source-dir', default='datasets')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {}
+
+        for layout in ['flat', 'star']:
+            dest_dir = os.path.join(tmp_dir, layout)
+            star_dir = os.path.join(dest_dir, 'star')
+            config = DataIngestionConfig(args.source_dir, dest_dir, 'data.csv', layout, star_dir)
+
+            start = time.perf_counter()
+            DataIngestion(config).initiate_data_ingestion()
+            ingestion_time = time.perf_counter() - start
+
+            # orders delivery information, one row per order
+            start = time.perf_counter()
+            if layout == 'star':
+                orders = pd.read_csv(Path(star_dir) / STAR_ORDERS_FILENAME, usecols=DELIVERY_COLUMNS)
+            else:
+                orders = pd.read_csv(Path(dest_dir) / 'data.csv', usecols=DELIVERY_COLUMNS)
+                orders = orders.drop_duplicates(subset=['order_id'])
+            query_time = time.perf_counter() - start
+
+            results[layout] = (directory_size(dest_dir), ingestion_time, query_time, orders.shape[0])
+
+    print(f'{"layout":<8}{"size (MB)":>12}{"ingestion (s)":>16}{"orders query (s)":>20}{"orders":>10}')
+    for layout, (size, ingestion_time, query_time, n_orders) in results.items():
+        print(f'{layout:<8}{size / 2**20:>12.1f}{ingestion_time:>16.2f}{query_time:>20.3f}{n_orders:>10}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+'''
+Compare the sequential loading of the olist source files with the C csv engine against
+DataIngestion.load_datasets (concurrent, with explicit dtypes and the pyarrow engine when installed),
+on the source files replicated a number of times.
+
+Usage: python benchmarks/ingestion_loading.py [--source-dir datasets] [--scale 5]
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.components.data_ingestion import DataIngestion, CSV_ENGINE
+from src.entity.config_entity import DataIngestionConfig
+
+def replicate_sources(source_dir: Path, dest_dir: Path, scale: int):
+    # append the data rows of each file scale times
+    for filename in os.listdir(source_dir):
+        with open(source_dir / filename, 'rb') as source_file:
+            header = source_file.readline()
+            rows = source_file.read()
+
+        if rows and not rows.endswith(b'\n'):
+            rows += b'\n'
+
+        with open(dest_dir / filename, 'wb') as dest_file:
+            dest_file.write(header)
+            for _ in range(scale):
+                dest_file.write(rows)
+
+def load_sequential(source_dir: Path) -> dict:
+    return {
+        filename : pd.read_csv(source_dir / filename)
+        for filename in os.listdir(source_dir)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source-dir', default='datasets')
+    parser.add_argument('--scale', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        replicate_sources(Path(args.source_dir), tmp_dir, args.scale)
+
+        config = DataIngestionConfig(str(tmp_dir), str(tmp_dir), 'data.csv', 'flat', str(tmp_dir))
+        ingestion = DataIngestion(config)
+
+        results = {}
+        for name, load in [('sequential (c)', lambda: load_sequential(tmp_dir)), (f'concurrent ({CSV_ENGINE})', ingestion.load_datasets)]:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                datasets = load()
+                times.append(time.perf_counter() - start)
+
+            memory = sum(dataset.memory_usage(deep=True).sum() for dataset in datasets.values())
+            results[name] = (min(times), memory)
+
+        size = sum(file.stat().st_size for file in tmp_dir.iterdir())
+
+    print(f'source files: {size / 2**20:.1f} MB (scale {args.scale})')
+    print(f'{"loader":<20}{"time (s)":>12}{"memory (MB)":>14}')
+    for name, (load_time, memory) in results.items():
+        print(f'{name:<20}{load_time:>12.2f}{memory / 2**20:>14.1f}')
+
+if __name__ == '__main__':
+    main()
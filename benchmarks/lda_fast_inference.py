@@ -0,0 +1,53 @@
+'''
+Compare the exact and the fast LDA inference of PredictPipeline on the held-out
+split: label agreement and speedup.
+
+Usage: python benchmarks/lda_fast_inference.py [--data artifacts/lda/data_tranformation/reviews_test.csv]
+'''
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.pipeline.predict_pipeline import PredictPipeline
+
+def timed_labels(pipeline: PredictPipeline, X, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        labels = pipeline.label_topics(X, pipeline.transform_topics(X))
+        best = min(best, time.perf_counter() - start)
+
+    return np.array(labels), best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='artifacts/lda/data_tranformation/reviews_test.csv')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-iter', type=int, default=30)
+    parser.add_argument('--tol', type=float, default=1e-2)
+    parser.add_argument('--early-stop-margin', type=float, default=0.05)
+    args = parser.parse_args()
+
+    vectors = pd.read_csv(args.data)['vectors']
+    X = sp.csr_matrix(np.array([ast.literal_eval(vector) for vector in vectors]))
+
+    pipeline = PredictPipeline(max_iter=args.max_iter, tol=args.tol, early_stop_margin=args.early_stop_margin)
+    exact_labels, exact_time = timed_labels(pipeline, X, args.repeat)
+
+    pipeline.fast_inference = True
+    fast_labels, fast_time = timed_labels(pipeline, X, args.repeat)
+
+    print(f'reviews: {X.shape[0]}')
+    print(f'exact inference: {exact_time:.3f}s, fast inference: {fast_time:.3f}s, speedup: {exact_time / fast_time:.1f}x')
+    print(f'label agreement: {np.mean(exact_labels == fast_labels):.4f}')
+
+if __name__ == '__main__':
+    main()
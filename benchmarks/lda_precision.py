@@ -0,0 +1,78 @@
+'''
+Compare the float64 and the float32 LDA inference of PredictPipeline on the held-out
+split: memory of the model and of the document-term matrix, speedup of the exact and
+fast inference and label agreement with the float64 model. The topic lookup is
+disabled, so every review goes through inference.
+
+Usage: python benchmarks/lda_precision.py [--data artifacts/lda/data_tranformation/reviews_test.csv] [--rows 100000]
+'''
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.constants import LDA_MODEL_PATH
+from src.pipeline.lda_inference import compact_csr, compact_lda_model
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.utils.common import load_object
+
+def csr_nbytes(X: sp.csr_matrix) -> int:
+    return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+
+def model_nbytes(lda_model) -> int:
+    return lda_model.components_.nbytes + lda_model.exp_dirichlet_component_.nbytes
+
+def timed_labels(pipeline: PredictPipeline, X, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        labels = pipeline.label_topics(X, pipeline.transform_topics(X))
+        best = min(best, time.perf_counter() - start)
+
+    return np.array(labels), best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='artifacts/lda/data_tranformation/reviews_test.csv')
+    parser.add_argument('--rows', type=int, default=None, help='replicate reviews up to a number of rows.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    vectors = pd.read_csv(args.data)['vectors']
+    X = sp.csr_matrix(np.array([ast.literal_eval(vector) for vector in vectors], dtype=np.int64))
+    if args.rows:
+        X = X[np.arange(args.rows) % X.shape[0]]
+
+    # int64 counts with int64 indices, as vectorized before, and the compact binary matrix
+    X_full = sp.csr_matrix((X.data, X.indices.astype(np.int64), X.indptr.astype(np.int64)), shape=X.shape)
+    X_compact = compact_csr(X)
+
+    lda_model = load_object(LDA_MODEL_PATH)
+    compact_model = compact_lda_model(lda_model, np.float32)
+
+    print(f'reviews: {X.shape[0]}, features: {X.shape[1]}')
+    print(f'model matrices: {model_nbytes(lda_model) / 1024:.1f} KiB -> {model_nbytes(compact_model) / 1024:.1f} KiB')
+    print(f'document-term matrix: {csr_nbytes(X_full) / 1024:.1f} KiB -> {csr_nbytes(X_compact) / 1024:.1f} KiB')
+
+    for fast_inference in (False, True):
+        pipelines = {}
+        for precision in ('float64', 'float32'):
+            pipelines[precision] = PredictPipeline(fast_inference=fast_inference, precision=precision)
+            pipelines[precision].topic_lookup = None
+
+        full_labels, full_time = timed_labels(pipelines['float64'], X_full, args.repeat)
+        compact_labels, compact_time = timed_labels(pipelines['float32'], X_compact, args.repeat)
+
+        name = 'fast' if fast_inference else 'exact'
+        print(f'{name} inference: float64 {full_time:.3f}s, float32 {compact_time:.3f}s, speedup: {full_time / compact_time:.2f}x, '
+              f'label agreement: {np.mean(full_labels == compact_labels):.4f}')
+
+if __name__ == '__main__':
+    main()
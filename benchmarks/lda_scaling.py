@@ -0,0 +1,106 @@
+'''
+Scaling of the LDA fit and of PredictPipeline topic inference from 1 to N cores,
+on the vectorized reviews replicated up to a number of rows. Speedups are only
+meaningful up to the cores of the machine, n_jobs above them just check that the
+topics do not change.
+
+Results with the defaults, on the 1 core machine the n_jobs defaults of params.yaml were chosen on:
+
+    n_jobs   fit (s)   exact (s)   fast (s)  exact speedup  fast speedup   max diff
+         1     19.04        3.32       0.06           1.00          1.00    0.0e+00
+         2     19.41        3.19       0.07           1.04          0.95    0.0e+00
+         4     27.26        2.68       0.07           1.24          0.83    0.0e+00
+
+Extra jobs only add process and thread overhead to the fit and the fast inference there, so
+both n_jobs default to 1. Run it again on the target machine before raising them.
+
+Usage: python benchmarks/lda_scaling.py [--rows 100000] [--jobs 1 2 4]
+'''
+import argparse
+import ast
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.decomposition import LatentDirichletAllocation
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.config.configuration import ConfigurationManager
+from src.pipeline.predict_pipeline import PredictPipeline
+
+def load_vectors(path: str, rows: int) -> sp.csr_matrix:
+    vectors = pd.read_csv(path)['vectors']
+    X = sp.csr_matrix(np.array([ast.literal_eval(vector) for vector in vectors]))
+
+    # replicate reviews up to the given number of rows
+    return X[np.arange(rows) % X.shape[0]]
+
+def timed(function, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='artifacts/lda/data_tranformation/reviews_train.csv')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--fit-rows', type=int, default=20000)
+    parser.add_argument('--jobs', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count()}))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    params = ConfigurationManager().get_lda_model_trainer_config()
+    X = load_vectors(args.data, args.rows)
+    X_fit = X[:args.fit_rows].toarray()
+
+    # compare topics of the exact and fast inference, lookup answers are the same for all jobs
+    pipeline = PredictPipeline()
+    pipeline.topic_lookup = None
+
+    results = []
+    reference = {}
+    for n_jobs in args.jobs:
+        pipeline.n_jobs = n_jobs
+
+        pipeline.fast_inference = False
+        exact_topics, exact_time = timed(lambda: pipeline.transform_topics(X), args.repeat)
+
+        pipeline.fast_inference = True
+        fast_topics, fast_time = timed(lambda: pipeline.transform_topics(X), args.repeat)
+
+        lda_model = LatentDirichletAllocation(
+            n_components=params.n_components,
+            doc_topic_prior=params.doc_prior,
+            topic_word_prior=params.word_prior,
+            max_iter=10,
+            n_jobs=n_jobs,
+            random_state=42
+        )
+        _, fit_time = timed(lambda: lda_model.fit(X_fit), 1)
+
+        reference.setdefault('exact', exact_topics)
+        reference.setdefault('fast', fast_topics)
+        max_diff = max(np.abs(exact_topics - reference['exact']).max(), np.abs(fast_topics - reference['fast']).max())
+
+        results.append((n_jobs, fit_time, exact_time, fast_time, max_diff))
+
+    if max(args.jobs) > os.cpu_count():
+        print(f'warning: n_jobs above the {os.cpu_count()} available cores, speedups are not meaningful for them')
+
+    print(f'cores available: {os.cpu_count()}, inference rows: {X.shape[0]}, fit rows: {X_fit.shape[0]} (10 iterations)')
+    print(f'{"n_jobs":>6}{"fit (s)":>10}{"exact (s)":>12}{"fast (s)":>11}{"exact speedup":>15}{"fast speedup":>14}{"max diff":>11}')
+    for n_jobs, fit_time, exact_time, fast_time, max_diff in results:
+        print(f'{n_jobs:>6}{fit_time:>10.2f}{exact_time:>12.2f}{fast_time:>11.2f}'
+              f'{results[0][2] / exact_time:>15.2f}{results[0][3] / fast_time:>14.2f}{max_diff:>11.1e}')
+
+if __name__ == '__main__':
+    main()
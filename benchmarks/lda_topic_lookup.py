@@ -0,0 +1,57 @@
+'''
+Hit rate of the topic lookup of PredictPipeline on the held-out split, and
+agreement of its labels with the ones of full inference.
+
+Usage: python benchmarks/lda_topic_lookup.py [--data artifacts/lda/data_tranformation/reviews_test.csv]
+'''
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.constants import LDA_MODEL_PATH
+from src.pipeline.lda_inference import TopicLookup
+from src.utils.common import load_object
+from src.pipeline.predict_pipeline import PredictPipeline
+
+def timed_labels(pipeline: PredictPipeline, X):
+    start = time.perf_counter()
+    labels = pipeline.label_topics(X, pipeline.transform_topics(X))
+
+    return np.array(labels), time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='artifacts/lda/data_tranformation/reviews_test.csv')
+    parser.add_argument('--max-terms', type=int, default=2, help='used when the pipeline has no lookup artifact.')
+    args = parser.parse_args()
+
+    vectors = pd.read_csv(args.data)['vectors']
+    X = sp.csr_matrix(np.array([ast.literal_eval(vector) for vector in vectors]))
+
+    pipeline = PredictPipeline()
+    topic_lookup = pipeline.topic_lookup
+    if topic_lookup is None:
+        topic_lookup = TopicLookup.build(load_object(LDA_MODEL_PATH), args.max_terms)
+
+    pipeline.topic_lookup = None
+    full_labels, full_time = timed_labels(pipeline, X)
+
+    pipeline.topic_lookup = topic_lookup
+    lookup_labels, lookup_time = timed_labels(pipeline, X)
+
+    _, found = topic_lookup.lookup(X)
+
+    print(f'reviews: {X.shape[0]}, lookup hit rate: {found.mean():.4f}')
+    print(f'full inference: {full_time:.3f}s, with lookup: {lookup_time:.3f}s')
+    print(f'label agreement: {np.mean(full_labels == lookup_labels):.4f}')
+
+if __name__ == '__main__':
+    main()
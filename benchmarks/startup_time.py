@@ -0,0 +1,66 @@
+'''
+Import time of the pipeline command line, the batch scoring command line and the dashboard,
+measured with python -X importtime in fresh interpreters and checked against a budget.
+Exits with status 1 when a target is over its budget.
+
+Usage: python benchmarks/startup_time.py [--repeat 5] [--top 5]
+'''
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# name, imports and budget in seconds
+TARGETS = [
+    ('pipeline cli (main.py)', 'import main', 0.25),
+    ('batch scoring cli', 'import src.pipeline.batch_predict', 0.8),
+    ('dashboard (app.py imports)', 'import streamlit, altair, src.constants, src.utils.common, src.pipeline.dashboard_metrics', 1.5)
+]
+
+def import_times(statement: str) -> list:
+    '''
+    Self and cumulative import time in microseconds and nesting level of each imported module.
+    '''
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, self_time, cumulative_time, name = line.replace('import time:', '|', 1).split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_time), int(cumulative_time), level))
+
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    over_budget = False
+    for name, statement, budget in TARGETS:
+        # keep the fastest run, the others are slowed down by the file system cache
+        runs = [import_times(statement) for _ in range(args.repeat)]
+        modules = min(runs, key=lambda run: sum(cumulative for _, _, cumulative, level in run if level == 0))
+        total = sum(cumulative for _, _, cumulative, level in modules if level == 0) / 1e6
+
+        status = 'ok' if total <= budget else 'OVER BUDGET'
+        over_budget |= total > budget
+
+        print(f'{name}: {total:.3f}s (budget {budget:.2f}s) {status}')
+        for module, _, cumulative, _ in sorted(
+                (module for module in modules if module[3] <= 1), key=lambda module: -module[2])[:args.top]:
+            print(f'    {cumulative / 1e6:>7.3f}s  {module}')
+
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == '__main__':
+    main()
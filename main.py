@@ -1,41 +1,39 @@
-from src.config.configuration import ConfigurationManager
-
-from src.components.data_ingestion import DataIngestion
-from src.components.data_preprocessing import DataPreprocessing
-from src.components.lda.data_ingestion import LDADataIngestion
-from src.components.lda.data_transformation import LDADataTranformation
-from src.components.lda.model_trainer import LDAModelTrainer
+import argparse
 
+from src.config.configuration import ConfigurationManager
+from src.constants import CONFIG_FILE_PATH, PARAMETERS_FILE_PATH
+from src.pipeline.stages import STAGES, run_stages
 from src.utils.exception import CustomException
-
-try:
-    config_manager = ConfigurationManager()
-
-    # main data ingestion
-    data_ingestion_config = config_manager.get_data_ingestion_config()
-    data_ingestion = DataIngestion(data_ingestion_config)
-    data_ingestion.initiate_data_ingestion()
-
-    # lda data ingestion
-    lda_data_ingestion_config = config_manager.get_lda_data_ingestion_config()
-    lda_data_ingestion = LDADataIngestion(lda_data_ingestion_config)
-    lda_data_ingestion = LDADataIngestion(lda_data_ingestion_config)
-    lda_data_ingestion.initiate_data_ingestion()
-
-    # lda data tranformation
-    lda_data_transformation_config = config_manager.get_lda_data_transformation_config()
-    lda_data_transformation = LDADataTranformation(lda_data_transformation_config)
-    lda_data_transformation.initiate_data_transformation()
-
-    # lda model trainer
-    lda_model_trainer_config = config_manager.get_lda_model_trainer_config()
-    lda_model_trainer = LDAModelTrainer(lda_model_trainer_config)
-    lda_model_trainer.initiate_model_trainer()
-
-    # main data preprocessing
-    data_preprocessing_config = config_manager.get_data_preprocessing_config()
-    data_preprocessing = DataPreprocessing(data_preprocessing_config)
-    data_preprocessing.initiate_data_preprocessing()
-
-except Exception as e:
-    raise CustomException(e)
\ No newline at end of file
+from src.utils import setup_logging
+
+def main(args=None):
+    '''
+    Run the given pipeline stages, all of them by default.
+    Usage: python main.py [stage ...] [--sample] [--config config.yaml] [--params params.yaml] [--artifacts-root dir]
+    '''
+    parser = argparse.ArgumentParser(description='Run the pipeline stages, all of them by default.')
+    parser.add_argument('stages', nargs='*', help=f'stages to run: {", ".join(STAGES)}.')
+    parser.add_argument('--sample', action='store_true', help='run on a stratified sample of orders, with artifacts at the sample artifacts root.')
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help=f'config file (default: {CONFIG_FILE_PATH}).')
+    parser.add_argument('--params', default=PARAMETERS_FILE_PATH, help=f'params file (default: {PARAMETERS_FILE_PATH}).')
+    parser.add_argument('--artifacts-root', default=None, help='root of all artifacts of this run, replacing the one of the config.')
+    parsed = parser.parse_args(args)
+
+    setup_logging()
+
+    try:
+        # without --sample, the sample mode of the config is used
+        config_manager = ConfigurationManager(
+            parsed.config,
+            parsed.params,
+            sample=True if parsed.sample else None,
+            artifacts_root=parsed.artifacts_root
+        )
+
+        run_stages(config_manager, parsed.stages)
+
+    except Exception as e:
+        raise CustomException(e)
+
+if __name__ == '__main__':
+    main()
@@ -8,5 +8,11 @@ setuptools.setup(
     name=PROJECT_NAME,
     version=PROJECT_VERSION,
     author=PROJECT_AUTHOR,
-    packages=setuptools.find_packages()
+    packages=setuptools.find_packages(),
+    entry_points={
+        'console_scripts': [
+            'olist-score-reviews=src.pipeline.batch_predict:main',
+            'olist-launch-runs=src.pipeline.launcher:main'
+        ]
+    }
 )
\ No newline at end of file
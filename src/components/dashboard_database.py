@@ -0,0 +1,52 @@
+from pathlib import Path
+import sqlite3
+import pandas as pd
+
+from src.utils.exception import CustomException
+from src.entity.config_entity import DashboardDatabaseConfig
+from src.pipeline.dashboard_metrics import compute_period_metrics
+from src.pipeline.delivery_metrics import DELIVERY_COLUMNS
+from src.pipeline.artifact_manifest import versioned_write, read_manifest
+from src.utils.common import create_directories, to_month_period
+from src.utils import logger
+
+class DashboardDatabase:
+    def __init__(self, config: DashboardDatabaseConfig):
+        self.config = config
+
+    def initiate_dashboard_database(self):
+        logger.info('starting dashboard database.')
+
+        try:
+            # load prepared data, delivery columns are missing in data prepared by older versions
+            source_columns = [
+                'order_id', 'order_status', 'order_purchase_timestamp', 'order_delivered_customer_date',
+                'order_estimated_delivery_date', 'review_score', 'complaint'
+            ] + DELIVERY_COLUMNS
+            df = pd.read_csv(self.config.source_data_path, usecols=lambda column: column in source_columns)
+
+            for column in ['order_purchase_timestamp', 'order_delivered_customer_date', 'order_estimated_delivery_date']:
+                df[column] = pd.to_datetime(df[column])
+
+            df['purchase_period'] = to_month_period(df.order_purchase_timestamp)
+
+            # all metrics of every selectable period
+            metrics = compute_period_metrics(df)
+
+            # saved as dashboard-<hash>.db and pointed by the manifest, the running dashboard reloads it when its version changes
+            dest_filename = Path(self.config.dest_dir) / self.config.database_filename
+            manifest_filename = Path(self.config.dest_dir) / self.config.manifest_filename
+
+            create_directories([self.config.dest_dir])
+
+            with versioned_write(manifest_filename, dest_filename) as tmp_filename:
+                with sqlite3.connect(tmp_filename) as connection:
+                    metrics.to_sql('metrics', connection, index=True, index_label='purchase_period')
+                    connection.execute('CREATE UNIQUE INDEX metrics_purchase_period ON metrics (purchase_period)')
+
+                connection.close()
+
+            logger.info(f'saved dashboard database at: {read_manifest(manifest_filename)[1]}')
+
+        except Exception as e:
+            raise CustomException(e)
@@ -1,87 +1,325 @@
 import os
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
+import numpy as np
 
 from src.utils.exception import CustomException
 from src.entity.config_entity import DataIngestionConfig
-from src.utils.common import create_directories
+from src.utils.common import atomic_write, create_directories, load_object, save_obj
 from src.utils import logger
+from src.constants import STAR_ORDERS_FILENAME, STAR_ITEMS_FILENAME, STAR_PAYMENTS_FILENAME, STAR_REVIEWS_FILENAME
+
+# dtypes of low cardinality text columns and of dates, kept as text as in the source files.
+# the other columns are inferred. every column reaches the ingestion output, so no column is skipped.
+SOURCE_DTYPES = {
+    'orders': {
+        'order_status' : 'category',
+        'order_purchase_timestamp' : str,
+        'order_approved_at' : str,
+        'order_delivered_carrier_date' : str,
+        'order_delivered_customer_date' : str,
+        'order_estimated_delivery_date' : str
+    },
+    'order_items': { 'shipping_limit_date' : str },
+    'order_reviews': { 'review_creation_date' : str, 'review_answer_timestamp' : str },
+    'order_payments': { 'payment_type' : 'category' },
+    'products': { 'product_category_name' : 'category' },
+    'customers': { 'customer_city' : 'category', 'customer_state' : 'category' },
+    'sellers': { 'seller_city' : 'category', 'seller_state' : 'category' },
+    'geolocation': { 'geolocation_city' : 'category', 'geolocation_state' : 'category' }
+}
+
+# multithreaded pyarrow csv parser, when installed
+CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
 
 class DataIngestion:
     def __init__(self, config: DataIngestionConfig):
         self.config = config
 
+    def load_dataset(self, dataset_path: Path, dataset_name: str) -> pd.DataFrame:
+        dtypes = SOURCE_DTYPES.get(dataset_name, {})
+
+        if CSV_ENGINE != 'pyarrow':
+            return pd.read_csv(dataset_path, dtype=dtypes)
+
+        import pyarrow as pa
+        from pyarrow import csv
+
+        # read text columns as strings, pyarrow would parse dates by itself
+        convert_options = csv.ConvertOptions(
+            column_types={ column : pa.string() for column, dtype in dtypes.items() if dtype is str },
+            strings_can_be_null=True
+        )
+
+        # keep the text dtype pandas infers by itself (str on pandas 3, object before it)
+        string_dtype = pd.Series(dtype=str).dtype
+        types_mapper = None
+        if isinstance(string_dtype, pd.api.extensions.ExtensionDtype):
+            types_mapper = { pa.string() : string_dtype, pa.large_string() : string_dtype }.get
+
+        dataset = csv.read_csv(dataset_path, convert_options=convert_options).to_pandas(types_mapper=types_mapper)
+
+        category_columns = [column for column, dtype in dtypes.items() if dtype == 'category']
+        dataset[category_columns] = dataset[category_columns].astype('category')
+
+        return dataset
+
+    def load_datasets(self) -> dict:
+        '''
+        Load olist datasets concurrently, named by their filenames without 'olist_' and '_dataset'.
+        '''
+        datasets_dir = Path(self.config.source_dir)
+        dataset_filenames = os.listdir(datasets_dir)
+
+        # remvove 'olist_' and '_dataset' from filenames
+        dataset_names = [
+            Path(dataset_filename.replace('olist_', '').replace('_dataset', '')).stem
+            for dataset_filename in dataset_filenames
+        ]
+
+        with ThreadPoolExecutor(max_workers=max(len(dataset_filenames), 1)) as executor:
+            loaded_datasets = executor.map(
+                self.load_dataset,
+                [datasets_dir / dataset_filename for dataset_filename in dataset_filenames],
+                dataset_names
+            )
+
+            datasets = dict(zip(dataset_names, loaded_datasets))
+
+        return datasets
+
+    def sample_orders(self, orders: pd.DataFrame, reviews: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Stratified sample of orders by purchase month and review score, with a fixed seed.
+        The fraction is reduced when needed to keep at most sample_max_orders orders, and the sample
+        size is split across strata by largest remainder, so the cap holds without leaving the strata.
+        '''
+        fraction = 1.0 if self.config.sample_fraction is None else self.config.sample_fraction
+        if self.config.sample_max_orders is not None:
+            fraction = min(fraction, self.config.sample_max_orders / max(orders.shape[0], 1))
+
+        # score of the first review of each order, orders without reviews are a stratum of their own
+        scores = reviews.drop_duplicates(subset=['order_id']).set_index('order_id').review_score
+        strata = pd.DataFrame({
+            'purchase_month': orders.order_purchase_timestamp.str[:7],
+            'review_score': orders.order_id.map(scores).fillna(0)
+        }, index=orders.index)
+
+        strata['stratum'] = strata.groupby(['purchase_month', 'review_score'], dropna=False).ngroup()
+
+        # orders of each stratum, rounded down, and the rounded total given to the largest remainders
+        sizes = np.bincount(strata.stratum)
+        quotas = sizes * fraction
+        counts = np.floor(quotas).astype(np.int64)
+
+        total = int(np.floor(orders.shape[0] * fraction + 0.5))
+        if self.config.sample_max_orders is not None:
+            total = min(total, self.config.sample_max_orders)
+
+        extra = max(total - counts.sum(), 0)
+        counts[np.argsort(counts - quotas, kind='stable')[:extra]] += 1
+        counts = np.minimum(counts, sizes)
+
+        # first orders of each stratum in a seeded random order
+        shuffled = strata.sample(frac=1, random_state=self.config.sample_seed)
+        rank = shuffled.groupby('stratum').cumcount().to_numpy()
+        sampled = shuffled.index[rank < counts[shuffled.stratum.to_numpy()]]
+
+        logger.info(f'sampled {sampled.shape[0]} orders out of {orders.shape[0]}.')
+
+        # keep the source order
+        return orders[orders.index.isin(sampled)]
+
+    def get_mean_locations(self, geolocation: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Mean latitude and longitude of each zip code prefix.
+        '''
+        # remover duplicated geolocations
+        unique_geolocations = geolocation.drop_duplicates().copy()
+
+        # remove irrelevant information
+        unique_geolocations.drop(['geolocation_city', 'geolocation_state'], axis=1, inplace=True)
+
+        # calculate mean location
+        mean_locations = unique_geolocations.groupby('geolocation_zip_code_prefix').agg({  
+            'geolocation_lat' : 'mean',
+            'geolocation_lng': 'mean'
+            }).reset_index()
+        
+        # rename geolocation_lat and geolocation_lng to mean_lat and mean_lon
+        # also, rename geolocation_zip_code_prefix to zip_code_prefix
+        mean_locations.columns = ['zip_code_prefix', 'mean_lat', 'mean_lon']
+
+        return mean_locations
+
+    def build_flat_dataset(self, datasets: dict) -> pd.DataFrame:
+        '''
+        Join all datasets into a single table, with one row per order, review, payment and item combination.
+        '''
+        # join datasets
+        final_dataset = datasets['orders'].copy()
+
+        final_dataset = final_dataset.merge(datasets['order_reviews'], how='left', on='order_id')
+        final_dataset = final_dataset.merge(datasets['order_payments'], how='left', on='order_id')
+        final_dataset = final_dataset.merge(datasets['order_items'], how='left', on='order_id')
+        final_dataset = final_dataset.merge(datasets['products'], how='left', on='product_id')
+        final_dataset = final_dataset.merge(datasets['sellers'], how='left', on='seller_id')
+        final_dataset = final_dataset.merge(datasets['customers'], how='left', on='customer_id')
+
+        # prepare geolocations
+        mean_locations = self.get_mean_locations(datasets['geolocation'])
+
+        # join geolocation to final_dataset
+        final_dataset = final_dataset.merge(
+            mean_locations,
+            how='left',
+            left_on='customer_zip_code_prefix',
+            right_on='zip_code_prefix')
+
+        final_dataset = final_dataset.merge(
+            mean_locations,
+            how='left',
+            left_on='seller_zip_code_prefix',
+            right_on='zip_code_prefix',
+            suffixes=['_costumer', '_seller'])
+        
+        # drop irrelevant columns
+        final_dataset.drop(
+            ['customer_id', 
+            'customer_zip_code_prefix', 
+            'zip_code_prefix_costumer',
+            'seller_zip_code_prefix',
+            'zip_code_prefix_seller'], axis=1, inplace=True)
+
+        return final_dataset
+
+    def build_star_tables(self, datasets: dict) -> dict:
+        '''
+        Build an orders fact table and separate items, payments and reviews tables, keyed by an integer order_key.
+        Columns are the same of the flat dataset, without the cross product of items and payments.
+        '''
+        mean_locations = self.get_mean_locations(datasets['geolocation'])
+        customer_locations = mean_locations.rename(columns={'mean_lat': 'mean_lat_costumer', 'mean_lon': 'mean_lon_costumer'})
+        seller_locations = mean_locations.rename(columns={'mean_lat': 'mean_lat_seller', 'mean_lon': 'mean_lon_seller'})
+
+        # orders fact table, with customers and their location
+        orders = datasets['orders'].copy()
+        orders.insert(0, 'order_key', np.arange(orders.shape[0], dtype=np.int32))
+
+        orders = orders.merge(datasets['customers'], how='left', on='customer_id')
+        orders = orders.merge(customer_locations, how='left', left_on='customer_zip_code_prefix', right_on='zip_code_prefix')
+        orders.drop(['customer_id', 'customer_zip_code_prefix', 'zip_code_prefix'], axis=1, inplace=True)
+
+        order_keys = orders[['order_id', 'order_key']]
+
+        def with_order_key(table: pd.DataFrame) -> pd.DataFrame:
+            table = table.merge(order_keys, how='inner', on='order_id')
+            table.drop('order_id', axis=1, inplace=True)
+            return table[['order_key'] + [column for column in table.columns if column != 'order_key']]
+
+        # items, with products, sellers and their location
+        items = with_order_key(datasets['order_items'])
+        items = items.merge(datasets['products'], how='left', on='product_id')
+        items = items.merge(datasets['sellers'], how='left', on='seller_id')
+        items = items.merge(seller_locations, how='left', left_on='seller_zip_code_prefix', right_on='zip_code_prefix')
+        items.drop(['seller_zip_code_prefix', 'zip_code_prefix'], axis=1, inplace=True)
+
+        return {
+            STAR_ORDERS_FILENAME: orders,
+            STAR_ITEMS_FILENAME: items,
+            STAR_PAYMENTS_FILENAME: with_order_key(datasets['order_payments']),
+            STAR_REVIEWS_FILENAME: with_order_key(datasets['order_reviews'])
+        }
+
+    def load_ingestion_state(self) -> dict:
+        '''
+        Load the number of incremental runs and the order ids ingested by them.
+        '''
+        state_path = Path(self.config.dest_dir) / self.config.state_filename
+
+        if state_path.exists():
+            return load_object(state_path)
+
+        return { 'run' : 0, 'order_ids' : set() }
+
+    def ingest_new_orders(self, datasets: dict):
+        '''
+        Join just the orders not ingested by previous runs and append them as new partitions,
+        one file per purchase month and run, like partitions_dir/purchase_month=2017-01/part-00001.csv.
+        '''
+        state = self.load_ingestion_state()
+        run = state['run'] + 1
+        part_filename = f'part-{run:05d}.csv'
+
+        partitions_dir = Path(self.config.partitions_dir)
+        create_directories([partitions_dir])
+
+        # remove partitions of a run that failed before saving its state
+        for orphan_partition in partitions_dir.rglob(part_filename):
+            orphan_partition.unlink()
+
+        orders = datasets['orders']
+        new_orders = orders[~orders.order_id.isin(state['order_ids'])]
+        logger.info(f'found {new_orders.shape[0]} new orders out of {orders.shape[0]} orders.')
+
+        if new_orders.empty:
+            return
+
+        # items, payments and reviews are left joined, so just the ones of new orders are kept
+        new_dataset = self.build_flat_dataset({ **datasets, 'orders' : new_orders })
+
+        # purchase timestamps are kept as text, like 'YYYY-MM-DD HH:MM:SS'
+        purchase_months = new_dataset.order_purchase_timestamp.str[:7]
+
+        logger.info(f'saving data ingestion partitions at: {partitions_dir}')
+        for purchase_month, partition in new_dataset.groupby(purchase_months, sort=True):
+            partition_dir = partitions_dir / f'purchase_month={purchase_month}'
+            create_directories([partition_dir], verbose=False)
+            with atomic_write(partition_dir / part_filename) as tmp_path:
+                partition.to_csv(tmp_path, index=False, header=True)
+
+        # state is saved last, so a failed run is ingested again
+        state['run'] = run
+        state['order_ids'].update(new_orders.order_id)
+        save_obj(Path(self.config.dest_dir) / self.config.state_filename, state)
+
     def initiate_data_ingestion(self):
         logger.info('starting data ingestion.')
 
         try:
             # load datasets
-            datasets = {}
-            datasets_dir = Path(self.config.source_dir)
-
-            for dataset_filename in os.listdir(datasets_dir):
-                # remvove 'olist_' and '_dataset' from filenames
-                datasets[Path(
-                    dataset_filename.\
-                    replace('olist_', '').\
-                    replace('_dataset', '')).stem] = pd.read_csv(datasets_dir / dataset_filename)
-                
-            # join datasets
-            final_dataset = datasets['orders'].copy()
-
-            final_dataset = final_dataset.merge(datasets['order_reviews'], how='left', on='order_id')
-            final_dataset = final_dataset.merge(datasets['order_payments'], how='left', on='order_id')
-            final_dataset = final_dataset.merge(datasets['order_items'], how='left', on='order_id')
-            final_dataset = final_dataset.merge(datasets['products'], how='left', on='product_id')
-            final_dataset = final_dataset.merge(datasets['sellers'], how='left', on='seller_id')
-            final_dataset = final_dataset.merge(datasets['customers'], how='left', on='customer_id')
-
-            # prepare geolocations
-
-            # remover duplicated geolocations
-            unique_geolocations = datasets['geolocation'].drop_duplicates().copy()
-
-            # remove irrelevant information
-            unique_geolocations.drop(['geolocation_city', 'geolocation_state'], axis=1, inplace=True)
-
-            # calculate mean location
-            mean_locations = unique_geolocations.groupby('geolocation_zip_code_prefix').agg({  
-                'geolocation_lat' : 'mean',
-                'geolocation_lng': 'mean'
-                }).reset_index()
-            
-            # rename geolocation_lat and geolocation_lng to mean_lat and mean_lon
-            # also, rename geolocation_zip_code_prefix to zip_code_prefix
-            mean_locations.columns = ['zip_code_prefix', 'mean_lat', 'mean_lon']
-
-            # join geolocation to final_dataset
-            final_dataset = final_dataset.merge(
-                mean_locations,
-                how='left',
-                left_on='customer_zip_code_prefix',
-                right_on='zip_code_prefix')
-
-            final_dataset = final_dataset.merge(
-                mean_locations,
-                how='left',
-                left_on='seller_zip_code_prefix',
-                right_on='zip_code_prefix',
-                suffixes=['_costumer', '_seller'])
-            
-            # drop irrelevant columns
-            final_dataset.drop(
-                ['customer_id', 
-                'customer_zip_code_prefix', 
-                'zip_code_prefix_costumer',
-                'seller_zip_code_prefix',
-                'zip_code_prefix_seller'], axis=1, inplace=True)
-            
-            # save final_dataset
-            dest_filename = Path(self.config.dest_dir + '/' + self.config.dest_filename)
-            logger.info(f'saving data ingestion result at: {dest_filename}')
-
-            create_directories([self.config.dest_dir])
-            final_dataset.to_csv(dest_filename, index=False, header=True)
+            datasets = self.load_datasets()
+
+            # sample runs ingest a subset of orders, every other table is reduced by the joins
+            if self.config.sample_fraction is not None or self.config.sample_max_orders is not None:
+                datasets['orders'] = self.sample_orders(datasets['orders'], datasets['order_reviews'])
+
+            if self.config.incremental:
+                self.ingest_new_orders(datasets)
+
+            elif self.config.layout == 'star':
+                star_tables = self.build_star_tables(datasets)
+
+                # save star tables
+                logger.info(f'saving data ingestion star tables at: {self.config.star_dir}')
+
+                create_directories([self.config.star_dir])
+                for table_filename, table in star_tables.items():
+                    with atomic_write(Path(self.config.star_dir) / table_filename) as tmp_path:
+                        table.to_csv(tmp_path, index=False, header=True)
+
+            else:
+                final_dataset = self.build_flat_dataset(datasets)
+
+                # save final_dataset
+                dest_filename = Path(self.config.dest_dir + '/' + self.config.dest_filename)
+                logger.info(f'saving data ingestion result at: {dest_filename}')
+
+                create_directories([self.config.dest_dir])
+                with atomic_write(dest_filename) as tmp_path:
+                    final_dataset.to_csv(tmp_path, index=False, header=True)
 
         except Exception as e:
-            raise CustomException(e)
\ No newline at end of file
+            raise CustomException(e)
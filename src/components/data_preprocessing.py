@@ -1,66 +1,222 @@
 import pandas as pd
 import numpy as np
 
+import os
 from pathlib import Path
 
 from src.utils.exception import CustomException
 from src.entity.config_entity import DataPreprocessingConfig
-from src.pipeline.predict_pipeline import PredictPipeline
-from src.utils.common import create_directories
+from src.pipeline.delivery_metrics import add_delivery_columns
+from src.utils.common import atomic_write, create_directories, hash_text, list_csv_files, load_object, save_obj, to_month_period
 from src.utils import logger
+from src.constants import STAR_ORDERS_FILENAME, STAR_ITEMS_FILENAME, STAR_REVIEWS_FILENAME
+
+# columns of the prepared data
+PREPARED_COLUMNS = [
+    'order_id', 'order_status', 'order_purchase_timestamp', 'order_delivered_customer_date',
+    'order_estimated_delivery_date', 'review_id', 'review_score', 'product_id',
+    'is_late', 'late_days', 'complaint', 'purchase_period'
+]
 
 class DataPreprocessing:
     def __init__(self, config: DataPreprocessingConfig):
         self.config = config
 
+    def read_flat_data(self, path: Path) -> pd.DataFrame:
+        '''
+        Read a flat data ingestion result, or one of its partitions, without the unused columns.
+        '''
+        df = pd.read_csv(path)
+
+        # drop unused variables
+        df.drop([
+            'payment_sequential', 'payment_type', 'payment_installments', 'payment_value',
+            'product_category_name', 'product_name_lenght', 'product_description_lenght',
+            'product_photos_qty', 'product_weight_g', 'product_length_cm', 'product_height_cm',
+            'product_width_cm', 'mean_lat_costumer', 'mean_lon_costumer', 'mean_lat_seller',
+            'mean_lon_seller', 'order_item_id', 'order_approved_at', 'order_delivered_carrier_date', 
+            'review_creation_date', 'review_answer_timestamp',
+            'seller_id', 'shipping_limit_date', 'price', 'freight_value', 'seller_city',
+            'seller_state', 'customer_unique_id', 'customer_city', 'customer_state'
+        ], axis=1, inplace=True)
+
+        return df
+
+    def load_source_data(self) -> pd.DataFrame:
+        '''
+        Load orders and their reviews from the data ingestion result.
+        '''
+        if self.config.source_layout == 'star':
+            # join orders with reviews and distinct products, payments are not used
+            star_dir = Path(self.config.source_star_dir)
+
+            orders = pd.read_csv(star_dir / STAR_ORDERS_FILENAME, usecols=[
+                'order_key', 'order_id', 'order_status', 'order_purchase_timestamp',
+                'order_delivered_customer_date', 'order_estimated_delivery_date'
+            ])
+            reviews = pd.read_csv(star_dir / STAR_REVIEWS_FILENAME, usecols=[
+                'order_key', 'review_id', 'review_score', 'review_comment_title', 'review_comment_message'
+            ])
+
+            products = pd.read_csv(star_dir / STAR_ITEMS_FILENAME, usecols=['order_key', 'product_id'])
+            products.drop_duplicates(inplace=True)
+
+            df = orders.merge(reviews, how='left', on='order_key')
+            df = df.merge(products, how='left', on='order_key')
+            df.drop('order_key', axis=1, inplace=True)
+
+            return df
+
+        return self.read_flat_data(self.config.source_data_path)
+
+    def load_labels_store(self, model_version: str) -> dict:
+        '''
+        Load the review hash -> complaint labels predicted in previous runs. Labels from another model version are discarded.
+        '''
+        if os.path.exists(self.config.labels_store_path):
+            store = load_object(self.config.labels_store_path)
+
+            if store['model_version'] == model_version:
+                return store['labels']
+
+        return {}
+
+    def predict_complaints(self, reviews: pd.Series) -> pd.Series:
+        '''
+        Predict the complaint type of each review, scoring each distinct review text only once.
+        '''
+        # imported here, it loads the LDA model dependencies
+        from src.pipeline.predict_pipeline import PredictPipeline
+
+        predict_pipeline = PredictPipeline(self.config.predict_pipeline, n_jobs=self.config.n_jobs)
+        labels = self.load_labels_store(predict_pipeline.model_version)
+
+        # factorize reviews into their unique texts
+        codes, unique_reviews = pd.factorize(reviews)
+        unique_hashes = [hash_text(review) for review in unique_reviews]
+
+        # score just reviews not scored in previous runs
+        new_reviews = [i for i, review_hash in enumerate(unique_hashes) if review_hash not in labels]
+        logger.info(f'scoring {len(new_reviews)} new reviews out of {len(unique_reviews)} unique and {len(reviews)} total reviews.')
+
+        if len(new_reviews) > 0:
+            predicted = predict_pipeline.predict_review(unique_reviews[new_reviews])
+            labels.update(zip([unique_hashes[i] for i in new_reviews], predicted))
+
+            save_obj(self.config.labels_store_path, {
+                'model_version': predict_pipeline.model_version,
+                'labels': labels
+            })
+
+        # broadcast labels back to every review
+        unique_labels = np.array([labels[review_hash] for review_hash in unique_hashes], dtype=object)
+        return pd.Series(unique_labels[codes], index=reviews.index)
+
+    def parse_dates(self, df: pd.DataFrame):
+        for column in df.columns:
+            if column.endswith(('_date', '_timestamp', '_at')):
+                df[column] = pd.to_datetime(df[column])
+
+    def prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        Parse dates, remove duplicates, compute deliveries lateness, predict the complaint type
+        of low score reviews and add the purchase month.
+        '''
+        # parse date variables
+        self.parse_dates(df)
+
+        # remove duplicates
+        df.drop_duplicates(inplace=True)
+
+        # is_late and late_days, computed once for the dashboard
+        add_delivery_columns(df)
+
+        # join review title and message
+        df['reviews'] = df.review_comment_title + '. ' + df.review_comment_message
+
+        # predict review complaint type
+        df['complaint'] = np.nan
+        df.complaint = df.complaint.astype(object)
+
+        low_score_reviews = df[df.review_score <= 2].reviews.dropna()
+        df.loc[low_score_reviews.index, 'complaint'] = self.predict_complaints(low_score_reviews)
+
+        # drop reviews
+        df.drop(['reviews', 'review_comment_title', 'review_comment_message'], axis=1, inplace=True)
+
+        # integer purchase month period, the dashboard metrics are grouped by it
+        df['purchase_period'] = to_month_period(df.order_purchase_timestamp)
+
+        return df
+
+    def prepare_new_partitions(self):
+        '''
+        Prepare just the data ingestion partitions not prepared by previous runs, all of them scored at once.
+        Prepared partitions mirror the ingestion partitions paths.
+        '''
+        source_dir = Path(self.config.source_partitions_dir)
+        partitions_dir = Path(self.config.partitions_dir)
+
+        new_partitions = [
+            source_path for source_path in list_csv_files(source_dir)
+            if not (partitions_dir / source_path.relative_to(source_dir)).exists()
+        ]
+        logger.info(f'preparing {len(new_partitions)} new data ingestion partitions.')
+
+        if len(new_partitions) == 0:
+            return
+
+        # the first index level identifies the partition of each row
+        df = pd.concat(
+            [self.read_flat_data(source_path) for source_path in new_partitions],
+            keys=range(len(new_partitions))
+        )
+        df = self.prepare_data(df)
+
+        for i, partition in df.groupby(level=0, sort=False):
+            dest_path = partitions_dir / new_partitions[i].relative_to(source_dir)
+            create_directories([dest_path.parent], verbose=False)
+
+            # written under a temporary name, so just complete partitions are seen as prepared
+            with atomic_write(dest_path) as tmp_path:
+                partition.to_csv(tmp_path, index=False, header=True)
+
+    def load_prepared_partitions(self) -> pd.DataFrame:
+        '''
+        Join all prepared partitions, an empty frame with the prepared columns when there are none yet.
+        '''
+        partitions = list_csv_files(self.config.partitions_dir) if Path(self.config.partitions_dir).exists() else []
+
+        if len(partitions) == 0:
+            logger.warning(f'no prepared partitions at {self.config.partitions_dir}.')
+            return pd.DataFrame(columns=PREPARED_COLUMNS)
+
+        df = pd.concat([pd.read_csv(path) for path in partitions], ignore_index=True)
+
+        # parsed so dates are written in the same format by all partitions
+        self.parse_dates(df)
+
+        return df
+
     def initiate_data_preprocessing(self):
         logger.info('starting data preprocessing.')
 
         try:
-            # load dataset
-            df = pd.read_csv(self.config.source_data_path)
-
-            # drop unused variables
-            df.drop([
-                'payment_sequential', 'payment_type', 'payment_installments', 'payment_value',
-                'product_category_name', 'product_name_lenght', 'product_description_lenght',
-                'product_photos_qty', 'product_weight_g', 'product_length_cm', 'product_height_cm',
-                'product_width_cm', 'mean_lat_costumer', 'mean_lon_costumer', 'mean_lat_seller',
-                'mean_lon_seller', 'order_item_id', 'order_approved_at', 'order_delivered_carrier_date', 
-                'review_creation_date', 'review_answer_timestamp',
-                'seller_id', 'shipping_limit_date', 'price', 'freight_value', 'seller_city',
-                'seller_state', 'customer_unique_id', 'customer_city', 'customer_state'
-            ], axis=1, inplace=True)
-
-            # parse date variables
-            for column in df.columns:
-                if column.endswith(('_date', '_timestamp', '_at')):
-                    df[column] = pd.to_datetime(df[column])
-
-            # remove duplicates
-            df.drop_duplicates(inplace=True)
-
-            # join review title and message
-            df['reviews'] = df.review_comment_title + '. ' + df.review_comment_message
-
-            # predict review complaint type
-            df['complaint'] = np.nan
-            df.complaint = df.complaint.astype(object)
-
-            predict_pipeline = PredictPipeline()
-            low_score_reviews = df[df.review_score <= 2].reviews.dropna()
-            predicted_complaint = predict_pipeline.predict_review(low_score_reviews)
-            df.loc[low_score_reviews.index, 'complaint'] = predicted_complaint
-
-            # drop reviews
-            df.drop(['reviews', 'review_comment_title', 'review_comment_message'], axis=1, inplace=True)
+            if self.config.incremental:
+                # just new partitions are scored
+                self.prepare_new_partitions()
+                df = self.load_prepared_partitions()
+
+            else:
+                df = self.prepare_data(self.load_source_data())
 
             # save prepared data
             dest_filename = Path(self.config.dest_dir + '/' + self.config.dest_filename)
             logger.info(f'saving data preprocessing result at: {dest_filename}')
 
             create_directories([self.config.dest_dir])
-            df.to_csv(dest_filename, index=False, header=True)
+            with atomic_write(dest_filename) as tmp_path:
+                df.to_csv(tmp_path, index=False, header=True)
 
         except Exception as e:
             raise CustomException(e)
\ No newline at end of file
@@ -0,0 +1,74 @@
+from pathlib import Path
+import pandas as pd
+import numpy as np
+
+from src.utils.exception import CustomException
+from src.entity.config_entity import GeoFeaturesConfig
+from src.utils.common import atomic_write, create_directories, list_csv_files, save_obj
+from src.utils import logger
+from src.pipeline.geo import haversine_km, SellerIndex
+from src.constants import STAR_ORDERS_FILENAME, STAR_ITEMS_FILENAME
+
+class GeoFeatures:
+    def __init__(self, config: GeoFeaturesConfig):
+        self.config = config
+
+    def load_order_items(self) -> pd.DataFrame:
+        '''
+        Load order items with their seller and the customer and seller mean locations.
+        '''
+        location_columns = ['mean_lat_costumer', 'mean_lon_costumer', 'mean_lat_seller', 'mean_lon_seller']
+
+        if self.config.source_layout == 'star':
+            star_dir = Path(self.config.source_star_dir)
+
+            orders = pd.read_csv(star_dir / STAR_ORDERS_FILENAME, usecols=['order_key', 'order_id', 'mean_lat_costumer', 'mean_lon_costumer'])
+            items = pd.read_csv(star_dir / STAR_ITEMS_FILENAME, usecols=['order_key', 'order_item_id', 'seller_id', 'mean_lat_seller', 'mean_lon_seller'])
+
+            items = items.merge(orders, how='inner', on='order_key')
+            return items[['order_id', 'order_item_id', 'seller_id'] + location_columns]
+
+        # flat data, or its partitions, repeats items for each payment and review
+        items = pd.concat([
+            pd.read_csv(source_path, usecols=['order_id', 'order_item_id', 'seller_id'] + location_columns)
+            for source_path in list_csv_files(self.config.source_data_path)
+        ], ignore_index=True)
+        items = items.dropna(subset=['order_item_id']).drop_duplicates(subset=['order_id', 'order_item_id'])
+        items['order_item_id'] = items.order_item_id.astype(np.int64)
+
+        return items
+
+    def initiate_geo_features(self):
+        logger.info('starting geo features.')
+
+        try:
+            items = self.load_order_items()
+
+            # customer to seller distance of every order item
+            distances = items[['order_id', 'order_item_id', 'seller_id']].copy()
+            distances['distance_km'] = haversine_km(
+                items.mean_lat_costumer, items.mean_lon_costumer,
+                items.mean_lat_seller, items.mean_lon_seller
+            ).astype(np.float32)
+
+            logger.info(f'computed distances of {distances.shape[0]} order items, median of {distances.distance_km.median():.1f} km.')
+
+            dest_dir = Path(self.config.dest_dir)
+            create_directories([dest_dir])
+
+            logger.info(f'saving order items distances at: {dest_dir / self.config.distances_filename}')
+            with atomic_write(dest_dir / self.config.distances_filename) as tmp_path:
+                distances.to_csv(tmp_path, index=False, header=True)
+
+            # spatial index of the sellers locations
+            if items[['mean_lat_seller', 'mean_lon_seller']].notna().all(axis=1).any():
+                seller_index = SellerIndex.build(items)
+
+                logger.info(f'saving seller index of {seller_index.centroids.shape[0]} locations at: {dest_dir / self.config.index_filename}')
+                save_obj(dest_dir / self.config.index_filename, seller_index)
+
+            else:
+                logger.warning('no seller has a known location, seller index not saved.')
+
+        except Exception as e:
+            raise CustomException(e)
\ No newline at end of file
@@ -1,14 +1,14 @@
 import os
+from contextlib import ExitStack
 from pathlib import Path
 import pandas as pd
+import numpy as np
 
 from src.utils.exception import CustomException
 from src.entity.config_entity import LDADataIngestionConfig
-from src.utils.common import create_directories
+from src.utils.common import atomic_write, create_directories, hash_text, list_csv_files
 from src.utils import logger
 
-from sklearn.model_selection import train_test_split
-
 class LDADataIngestion:
     def __init__(self, config: LDADataIngestionConfig):
         self.config = config
@@ -17,34 +17,71 @@ class LDADataIngestion:
         logger.info('starting data ingestion for LDA model.')
 
         try:
-            # load source data
-            source_df = pd.read_csv(self.config.source_data_path)
-
-            # keep just instances where review_score is less or equal to 3
-            source_df = source_df[source_df.review_score <= 3]
-
-            # join review title and message
-            reviews = source_df.review_comment_title + '. ' + source_df.review_comment_message
-
-            # remove null or duplicated reviews
-            reviews.dropna(inplace=True)
-            reviews.drop_duplicates(inplace=True)
-            reviews = reviews.to_frame(name='reviews')
-
-            # split train and test data
-            reviews_train, reviews_test = train_test_split(reviews, test_size=0.2, random_state=42)
-
-            # save files
             dest_filename = Path(self.config.dest_dir + '/' + self.config.dest_filename)
             dest_train_filename = Path(self.config.dest_dir + '/' + self.config.dest_train_filename)
             dest_test_filename = Path(self.config.dest_dir + '/' + self.config.dest_test_filename)
-            
+
             logger.info(f'saving data ingestion result at: {dest_filename}, {dest_train_filename}, {dest_test_filename}')
 
             create_directories([self.config.dest_dir])
-            reviews.to_csv(dest_filename, index=False, header=True)
-            reviews_train.to_csv(dest_train_filename, index=False, header=True)
-            reviews_test.to_csv(dest_test_filename, index=False, header=True)
+
+            # results are written to temporary files, moved to their destinations once all chunks are written
+            with ExitStack() as stack:
+                tmp_filename, tmp_train_filename, tmp_test_filename = [
+                    stack.enter_context(atomic_write(filename))
+                    for filename in [dest_filename, dest_train_filename, dest_test_filename]
+                ]
+
+                # write headers, chunks are appended after
+                for filename in [tmp_filename, tmp_train_filename, tmp_test_filename]:
+                    pd.DataFrame(columns=['reviews']).to_csv(filename, index=False, header=True)
+
+                # load just the review columns of source data, file by file and chunk by chunk
+                source_chunks = (
+                    source_chunk
+                    for source_path in list_csv_files(self.config.source_data_path)
+                    for source_chunk in pd.read_csv(
+                        source_path,
+                        usecols=['review_score', 'review_comment_title', 'review_comment_message'],
+                        chunksize=self.config.chunk_size
+                    )
+                )
+
+                seen_digests = set()
+                reviews_count = 0
+                test_count = 0
+
+                for source_df in source_chunks:
+                    # keep just instances where review_score is less or equal to 3
+                    source_df = source_df[source_df.review_score <= 3]
+
+                    # join review title and message
+                    reviews = source_df.review_comment_title + '. ' + source_df.review_comment_message
+
+                    # remove null or duplicated reviews, also the ones seen in previous chunks
+                    reviews = reviews.dropna()
+                    digests = reviews.map(hash_text).astype(np.uint64)
+
+                    is_new = ~digests.duplicated() & ~digests.isin(seen_digests)
+                    reviews = reviews[is_new]
+                    digests = digests[is_new]
+                    seen_digests.update(digests.tolist())
+
+                    if reviews.empty:
+                        continue
+
+                    # split train and test data by the review hash, so a review always goes to the same split
+                    is_test = (digests / 2**64 < self.config.test_size).to_numpy()
+
+                    reviews = reviews.to_frame(name='reviews')
+                    reviews.to_csv(tmp_filename, mode='a', index=False, header=False)
+                    reviews[~is_test].to_csv(tmp_train_filename, mode='a', index=False, header=False)
+                    reviews[is_test].to_csv(tmp_test_filename, mode='a', index=False, header=False)
+
+                    reviews_count += reviews.shape[0]
+                    test_count += int(is_test.sum())
+
+            logger.info(f'lda data ingestion found {reviews_count} unique reviews, {test_count} for testing.')
 
         except Exception as e:
-            raise CustomException(e)
\ No newline at end of file
+            raise CustomException(e)
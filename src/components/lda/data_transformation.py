@@ -4,17 +4,17 @@ import pandas as pd
 
 from src.utils.exception import CustomException
 from src.entity.config_entity import LDADataTransformationConfig
-from src.utils.common import create_directories, save_obj
+from src.utils.common import atomic_write, create_directories, save_obj
 from src.utils import logger
+from src.pipeline.lda_inference import compact_csr
 
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.pipeline import Pipeline
 
 import re
-import spacy
-from spacy.tokens import Doc
-from spacy.lang.pt.stop_words import STOP_WORDS
+import numpy as np
+import scipy.sparse as sp
 
 class LDADataTranformation:
     def __init__(self, config: LDADataTransformationConfig):
@@ -27,7 +27,8 @@ class LDADataTranformation:
                     ('preprocessing', TextPreprocessing(
                         self.config.custom_stop_words,
                         self.config.typos_correction,
-                        self.config.words_substitution
+                        self.config.words_substitution,
+                        output_format=self.config.preprocessing_output
                     )),
                     ('vectorizer', TextVectorizer(
                         self.config.max_ngram,
@@ -69,8 +70,11 @@ class LDADataTranformation:
 
             # save train and test results
             logger.info(f'saving data tranformation results at: {dest_dir}')
-            train_result_df.to_csv(dest_dir / self.config.dest_train_filename)
-            test_result_df.to_csv(dest_dir / self.config.dest_test_filename)
+            with atomic_write(dest_dir / self.config.dest_train_filename) as tmp_path:
+                train_result_df.to_csv(tmp_path)
+
+            with atomic_write(dest_dir / self.config.dest_test_filename) as tmp_path:
+                test_result_df.to_csv(tmp_path)
 
             # save transformer object
             save_obj(dest_dir / self.config.transformer_obj_filename, preprocessing_obj)
@@ -78,6 +82,42 @@ class LDADataTranformation:
         except Exception as e:
             raise CustomException(e)
 
+class TokenizedDocs:
+    '''
+    TokenizedDocs
+    -------------
+    Compact CSR-like representation of preprocessed documents. The tokens of the
+    i-th document are `vocabulary[ids[offsets[i]:offsets[i + 1]]]`.
+
+    Attributes
+    ----------
+    offsets : np.ndarray
+        Array of size n_docs + 1 with the start of each document in ids.
+
+    ids : np.ndarray
+        Token ids of all documents, concatenated.
+
+    vocabulary : list[str]
+        Words referenced by the token ids.
+    '''
+
+    def __init__(self, offsets, ids, vocabulary) -> None:
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.vocabulary = vocabulary
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def to_texts(self):
+        '''
+        Return each document as text, the same output of TextPreprocessing with output_format='text'.
+        '''
+        return [
+            ' '.join(self.vocabulary[i] for i in self.ids[start:end])
+            for start, end in zip(self.offsets[:-1], self.offsets[1:])
+        ]
+
 class TextPreprocessing(BaseEstimator, TransformerMixin):
     '''
     TextPreprocessing
@@ -94,18 +134,24 @@ class TextPreprocessing(BaseEstimator, TransformerMixin):
 
     words_substitution : dict[str, list[str]]
         A dictionary with words and their possible replacements.
+
+    output_format : str ['text', 'ids']
+        'text' returns each document as a string, 'ids' returns a TokenizedDocs
+        that TextVectorizer counts directly, without tokenizing the texts again.
     '''
 
     def __init__(self,
                  custom_stop_words,
                  typos_correction,
                  words_substitution,
-                 nlp=None) -> None:
+                 nlp=None,
+                 output_format='text') -> None:
         self.__nlp = nlp
 
         self.custom_stop_words = custom_stop_words
         self.typos_correction = typos_correction
         self.words_substitution = words_substitution
+        self.output_format = output_format
 
         self.__training = False
 
@@ -115,7 +161,8 @@ class TextPreprocessing(BaseEstimator, TransformerMixin):
             self.custom_stop_words,
             self.typos_correction,
             self.words_substitution,
-            None
+            None,
+            self.output_format
         ))
 
     def __initialize_nlp(self):
@@ -124,6 +171,9 @@ class TextPreprocessing(BaseEstimator, TransformerMixin):
         '''
         try:
             if self.__nlp is None:
+                # spacy is imported just when texts are preprocessed, loading a pipeline does not need it
+                import spacy
+
                 self.__nlp = spacy.load('pt_core_news_md', disable=['parser', 'ner', 'textcat', 'custom'])
         
         except Exception as e:
@@ -160,9 +210,16 @@ class TextPreprocessing(BaseEstimator, TransformerMixin):
             docs = [doc for doc in self.__nlp.pipe(correct_texts)]
 
             # create stopwords
+            from spacy.lang.pt.stop_words import STOP_WORDS
             stopwords = STOP_WORDS | set(self.custom_stop_words)
 
             docs_clean = []
+
+            # token ids output, documents are stored as ids[offsets[i]:offsets[i + 1]]
+            token_index = {}
+            ids = []
+            offsets = [0]
+
             for doc in docs:
                 words = []
 
@@ -197,25 +254,20 @@ class TextPreprocessing(BaseEstimator, TransformerMixin):
                             continue
                     unique_words.append(word)
 
-                if self.__training:
-                    # if is training, then ignore docs with no representation or that are present in ignored_single_train_texts
-                    if len(unique_words) > 0:
-                        spaces = [True] * len(unique_words)
-                        spaces[-1] = False
-
-                        final_doc = Doc(self.__nlp.vocab, unique_words, spaces)
-                        docs_clean.append(final_doc)
+                # if is training, then ignore docs with no representation
+                if self.__training and len(unique_words) == 0:
+                    continue
 
+                if self.output_format == 'ids':
+                    ids.extend(token_index.setdefault(word, len(token_index)) for word in unique_words)
+                    offsets.append(len(ids))
                 else:
-                    spaces = []
-                    if len(unique_words) > 0:
-                        spaces = [True] * len(unique_words)
-                        spaces[-1] = False
+                    docs_clean.append(' '.join(unique_words))
 
-                    docs_clean.append(Doc(self.__nlp.vocab, unique_words, spaces))
+            if self.output_format == 'ids':
+                return TokenizedDocs(offsets, ids, list(token_index))
 
-            # return each doc as text
-            return [doc.text for doc in docs_clean]
+            return docs_clean
     
         except Exception as e:
             raise CustomException(e)
@@ -239,16 +291,24 @@ class TextVectorizer(BaseEstimator, TransformerMixin):
 
     max_features : int
         Max vocabulary size.
+
+    dtype : np.dtype
+        Dtype of the binary counts, stored with int32 indices.
     '''
 
-    def __init__(self, max_ngram, max_df, min_df, max_features) -> None:
+    def __init__(self, max_ngram, max_df, min_df, max_features, dtype=np.uint8) -> None:
         self.max_ngram = max_ngram
         self.max_df = max_df
         self.min_df = min_df
         self.max_features = max_features
+        self.dtype = dtype
         self.vectorizer = None
 
     def fit(self, X, y=None):
+        # vocabulary selection is done once, on texts
+        if isinstance(X, TokenizedDocs):
+            X = X.to_texts()
+
         # first uses TFIDF
         tfidf_vectorizer = TfidfVectorizer(
             ngram_range=(1, self.max_ngram),
@@ -266,7 +326,8 @@ class TextVectorizer(BaseEstimator, TransformerMixin):
             ngram_range=(1, self.max_ngram),
             vocabulary=tfidf_vectorizer.get_feature_names_out().tolist(),
             strip_accents='unicode',
-            binary=True
+            binary=True,
+            dtype=self.dtype
         )
 
         self.vectorizer.fit(X)
@@ -274,4 +335,85 @@ class TextVectorizer(BaseEstimator, TransformerMixin):
         return self
 
     def transform(self, X, y=None):
-        return self.vectorizer.transform(X)
\ No newline at end of file
+        if isinstance(X, TokenizedDocs):
+            return self.__transform_tokenized(X)
+
+        return compact_csr(self.vectorizer.transform(X), self.vectorizer.dtype)
+
+    def __transform_tokenized(self, docs: TokenizedDocs):
+        '''
+        Build the binary ngram count matrix straight from token ids, matching vectorizer.transform on the same texts.
+        '''
+        try:
+            preprocess = self.vectorizer.build_preprocessor()
+            tokenize = self.vectorizer.build_tokenizer()
+
+            # split each word like the vectorizer analyzer does (accents, short tokens)
+            term_index = {}
+            word_terms = [
+                [term_index.setdefault(term, len(term_index)) for term in tokenize(preprocess(word))]
+                for word in docs.vocabulary
+            ]
+
+            word_lengths = np.array([len(terms) for terms in word_terms], dtype=np.int64)
+            word_starts = np.concatenate([[0], np.cumsum(word_lengths)])
+            flat_terms = np.fromiter((t for terms in word_terms for t in terms), dtype=np.int64, count=word_starts[-1])
+
+            # expand documents ids into term ids
+            token_lengths = word_lengths[docs.ids]
+            token_positions = np.repeat(word_starts[docs.ids] - np.cumsum(token_lengths) + token_lengths, token_lengths)
+            terms = flat_terms[token_positions + np.arange(token_positions.shape[0])]
+
+            token_ends = np.concatenate([[0], np.cumsum(token_lengths)])
+            doc_lengths = token_ends[docs.offsets[1:]] - token_ends[docs.offsets[:-1]]
+            doc_ends = np.repeat(np.cumsum(doc_lengths), doc_lengths)
+            term_docs = np.repeat(np.arange(len(docs)), doc_lengths)
+
+            # group vectorizer features by ngram size, encoded as integer keys
+            n_terms = max(len(term_index), 1)
+            features = {}
+            for feature, column in self.vectorizer.vocabulary_.items():
+                feature_terms = feature.split(' ')
+                if any(term not in term_index for term in feature_terms):
+                    continue
+
+                key = 0
+                for term in feature_terms:
+                    key = key * n_terms + term_index[term]
+                features.setdefault(len(feature_terms), []).append((key, column))
+
+            rows = []
+            cols = []
+            for n, keys_columns in features.items():
+                keys_columns.sort()
+                feature_keys = np.array([k for k, _ in keys_columns], dtype=np.int64)
+                feature_columns = np.array([c for _, c in keys_columns], dtype=np.int64)
+
+                # ngrams starting at each position that do not cross the document end
+                starts = np.flatnonzero(np.arange(terms.shape[0]) + n <= doc_ends)
+                keys = np.zeros(starts.shape[0], dtype=np.int64)
+                for k in range(n):
+                    keys = keys * n_terms + terms[starts + k]
+
+                found = np.searchsorted(feature_keys, keys)
+                found[found == feature_keys.shape[0]] = 0
+                match = feature_keys[found] == keys
+
+                rows.append(term_docs[starts[match]])
+                cols.append(feature_columns[found[match]])
+
+            rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+            cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+
+            X = sp.csr_matrix(
+                (np.ones(rows.shape[0], dtype=np.int64), (rows, cols)),
+                shape=(len(docs), len(self.vectorizer.vocabulary_))
+            )
+            X.sum_duplicates()
+            X.data[:] = 1
+
+            # vectorizers saved before the dtype option count in int64
+            return compact_csr(X, self.vectorizer.dtype)
+
+        except Exception as e:
+            raise CustomException(e)
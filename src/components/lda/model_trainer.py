@@ -1,20 +1,166 @@
 import os
+import inspect
 from pathlib import Path
 import pandas as pd
 import numpy as np
 import ast
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
 
 from src.utils.exception import CustomException
 from src.entity.config_entity import LDAModelTrainerConfig
-from src.utils.common import create_directories, save_obj
+from src.utils.common import atomic_write, create_directories, save_obj, load_object, hash_files, hash_text
 from src.utils import logger
+from src.pipeline.lda_inference import TopicLookup, compact_lda_model
 
+from joblib import effective_n_jobs
+import sklearn
 from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.utils import gen_batches
+from sklearn.utils.parallel import Parallel
+
+# sklearn internals driven by fit_model and the arguments it passes them, the range of
+# scikit-learn in requirements.txt is the one they were checked with
+LDA_FIT_INTERNALS = {
+    '_validate_params': [],
+    '_check_non_neg_array': ['X', 'reset_n_features', 'whom'],
+    '_init_latent_vars': ['n_features', 'dtype'],
+    '_em_step': ['X', 'total_samples', 'batch_update', 'parallel'],
+    '_e_step': ['X', 'cal_sstats', 'random_init', 'parallel'],
+    '_perplexity_precomp_distr': ['X', 'doc_topic_distr', 'sub_sampling']
+}
+
+def check_lda_internals():
+    '''
+    Raise when the installed scikit-learn lacks the LatentDirichletAllocation internals used by fit_model.
+    '''
+    changed = []
+    for name, arguments in LDA_FIT_INTERNALS.items():
+        method = getattr(LatentDirichletAllocation, name, None)
+
+        if method is None or not set(arguments).issubset(inspect.signature(method).parameters):
+            changed.append(name)
+
+    if changed:
+        raise CustomException(
+            f'scikit-learn {sklearn.__version__} changed the LatentDirichletAllocation internals {changed} '
+            'used by the checkpointed training, install the scikit-learn version of requirements.txt'
+        )
 
 class LDAModelTrainer:
     def __init__(self, config: LDAModelTrainerConfig) -> None:
         self.config = config
 
+    def get_fingerprint(self, lda_model: LatentDirichletAllocation) -> str:
+        '''
+        Identifies the training data and the model parameters, a checkpoint is resumed only by the same training.
+        '''
+        params = sorted((name, value) for name, value in lda_model.get_params().items() if name != 'n_jobs')
+        return f'{hash_files([self.config.train_data_path])}-{hash_text(repr(params))}'
+
+    def load_checkpoint(self, fingerprint: str):
+        '''
+        Model and perplexity trajectory of the latest checkpoint of this training, None without one.
+        '''
+        checkpoint_path = Path(self.config.dest_dir) / self.config.checkpoint_filename
+
+        if not checkpoint_path.exists():
+            return None
+
+        checkpoint = load_object(checkpoint_path)
+        if checkpoint['fingerprint'] != fingerprint:
+            logger.info('checkpoint of another training data or parameters found, training from the start.')
+            return None
+
+        return checkpoint
+
+    def fit_model(self, lda_model: LatentDirichletAllocation, train_data) -> Tuple[LatentDirichletAllocation, List[Tuple[int, float]]]:
+        '''
+        Same iterations of LatentDirichletAllocation.fit, saving a checkpoint of the model every checkpoint_every
+        iterations and resuming from the latest one. Every evaluate_every iterations the perplexity on training data
+        is logged, and the training stops when it changes less than perp_tol.
+
+        Args
+        ----
+        lda_model : LatentDirichletAllocation
+            Model to train.
+
+        train_data : array-like
+            Document term matrix of training data.
+
+        Returns
+        -------
+        lda_model : LatentDirichletAllocation
+            Trained model, the one of the checkpoint when resumed.
+
+        perplexities : List[Tuple[int, float]]
+            Iteration and perplexity of each evaluation.
+        '''
+        # fit internals of sklearn, the public api trains all iterations at once
+        check_lda_internals()
+        lda_model._validate_params()
+        train_data = lda_model._check_non_neg_array(train_data, reset_n_features=True, whom='LDAModelTrainer.fit_model')
+        n_samples, n_features = train_data.shape
+
+        fingerprint = self.get_fingerprint(lda_model)
+        checkpoint = self.load_checkpoint(fingerprint)
+
+        if checkpoint is None:
+            lda_model._init_latent_vars(n_features, dtype=train_data.dtype)
+            perplexities = []
+        else:
+            # the model keeps its random state, so resumed iterations are the same of an uninterrupted training
+            n_jobs = lda_model.n_jobs
+            lda_model = checkpoint['model']
+            lda_model.n_jobs = n_jobs
+            perplexities = checkpoint['perplexities']
+            logger.info(f'resuming lda model training from iteration {lda_model.n_iter_}.')
+
+        checkpoint_path = Path(self.config.dest_dir) / self.config.checkpoint_filename
+        create_directories([self.config.dest_dir])
+
+        evaluate_every = self.config.evaluate_every
+        last_bound = perplexities[-1][1] if perplexities else None
+        converged = False
+
+        with Parallel(n_jobs=effective_n_jobs(lda_model.n_jobs)) as parallel:
+            while lda_model.n_iter_ < lda_model.max_iter:
+                if lda_model.learning_method == 'online':
+                    for batch in gen_batches(n_samples, lda_model.batch_size):
+                        lda_model._em_step(train_data[batch, :], total_samples=n_samples, batch_update=False, parallel=parallel)
+                else:
+                    lda_model._em_step(train_data, total_samples=n_samples, batch_update=True, parallel=parallel)
+
+                # counts every EM step run, also the one that converged (sklearn fit leaves it one below)
+                iteration = lda_model.n_iter_ + 1
+                lda_model.n_iter_ = iteration
+
+                if evaluate_every > 0 and iteration % evaluate_every == 0:
+                    doc_topics, _ = lda_model._e_step(train_data, cal_sstats=False, random_init=False, parallel=parallel)
+                    bound = lda_model._perplexity_precomp_distr(train_data, doc_topics, sub_sampling=False)
+
+                    logger.info(f'iteration {iteration} of {lda_model.max_iter}, perplexity on training data: {bound:.4f}')
+                    perplexities.append((iteration, bound))
+
+                    if last_bound is not None and abs(last_bound - bound) < self.config.perp_tol:
+                        logger.info(f'perplexity changed less than {self.config.perp_tol}, stopping at iteration {iteration}.')
+                        converged = True
+                        break
+
+                    last_bound = bound
+
+                if self.config.checkpoint_every > 0 and iteration % self.config.checkpoint_every == 0 and iteration < lda_model.max_iter:
+                    save_obj(checkpoint_path, { 'fingerprint': fingerprint, 'model': lda_model, 'perplexities': perplexities })
+
+            if converged or (perplexities and perplexities[-1][0] == lda_model.n_iter_):
+                # the last evaluation already is the perplexity of the trained model
+                lda_model.bound_ = perplexities[-1][1]
+            else:
+                doc_topics, _ = lda_model._e_step(train_data, cal_sstats=False, random_init=False, parallel=parallel)
+                lda_model.bound_ = lda_model._perplexity_precomp_distr(train_data, doc_topics, sub_sampling=False)
+
+        return lda_model, perplexities
+
     def initiate_model_trainer(self):
         logger.info('starting lda model trainer.')
 
@@ -27,7 +173,7 @@ class LDAModelTrainer:
 
             # transform data vectors into numpy array
             train_data = [np.array(ast.literal_eval(train_vec)) for train_vec in train_data_df['vectors']]
-            test_data = [np.array(ast.literal_eval(test_vec)) for test_vec in test_data_df['vectors']]
+            test_data = np.array([ast.literal_eval(test_vec) for test_vec in test_data_df['vectors']])
 
             logger.info('creating and training model...')
             lda_model = LatentDirichletAllocation(
@@ -35,25 +181,48 @@ class LDAModelTrainer:
                 doc_topic_prior=self.config.doc_prior,
                 topic_word_prior=self.config.word_prior,
                 max_iter=self.config.max_iter,
+                learning_method=self.config.learning_method,
+                batch_size=self.config.batch_size,
+                n_jobs=self.config.n_jobs,
                 random_state=42
             )
 
-            lda_model.fit(train_data)
+            lda_model, perplexities = self.fit_model(lda_model, train_data)
+
+            # perplexity on training data is the bound of the last E-step of the fit
+            logger.info(f'lda model perplexity on training data: {lda_model.bound_}')
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # perplexity on testing data is evaluated while the model is saved
+                test_perplexity = executor.submit(lda_model.perplexity, test_data)
+
+                # create destiny directorysss
+                dest_dir = Path(self.config.dest_dir)
+                create_directories([dest_dir])
+
+                # save model
+                logger.info(f'saving model at: {dest_dir / self.config.model_filename}')
+                save_obj(dest_dir / self.config.model_filename, lda_model)
+
+                # float32 copy of the model used for inference
+                compact_model = compact_lda_model(lda_model, np.float32)
+                logger.info(f'saving float32 model at: {dest_dir / self.config.compact_model_filename}')
+                save_obj(dest_dir / self.config.compact_model_filename, compact_model)
 
-            # calculate perplecity for train and test data
-            train_perplexity = lda_model.perplexity(train_data)
-            test_perplexity = lda_model.perplexity(test_data)
+                # precompute topics of reviews with one or two terms, in the precision of inference
+                logger.info(f'saving topic lookup at: {dest_dir / self.config.lookup_filename}')
+                topic_lookup = TopicLookup.build(compact_model, self.config.lookup_max_terms)
+                save_obj(dest_dir / self.config.lookup_filename, topic_lookup)
 
-            logger.info(f'lda model perplexity on training data: {train_perplexity}')
-            logger.info(f'lda model perplexity on testing data: {test_perplexity}')
+                # perplexity trajectory of the training
+                logger.info(f'saving training perplexities at: {dest_dir / self.config.perplexities_filename}')
+                with atomic_write(dest_dir / self.config.perplexities_filename) as tmp_path:
+                    pd.DataFrame(perplexities, columns=['iteration', 'perplexity']).to_csv(tmp_path, index=False)
 
-            # create destiny directorysss
-            dest_dir = Path(self.config.dest_dir)
-            create_directories([dest_dir])
+                logger.info(f'lda model perplexity on testing data: {test_perplexity.result()}')
 
-            # save model
-            logger.info(f'saving model at: {dest_dir / self.config.model_filename}')
-            save_obj(dest_dir / self.config.model_filename, lda_model)
+            # the trained model is saved, next trainings start from the start
+            (dest_dir / self.config.checkpoint_filename).unlink(missing_ok=True)
 
         except Exception as e:
             raise CustomException(e)
\ No newline at end of file
@@ -1,51 +1,166 @@
+from pathlib import Path
+
 from src.constants import *
 from src.utils.common import read_yaml, create_directories
+from box import ConfigBox
+
+from src.entity.config_entity import RunContext
 
 from src.entity.config_entity import DataIngestionConfig
 from src.entity.config_entity import DataPreprocessingConfig
+from src.entity.config_entity import PredictPipelineConfig
+from src.entity.config_entity import GeoFeaturesConfig
+from src.entity.config_entity import DashboardDatabaseConfig
 from src.entity.config_entity import LDADataIngestionConfig
 from src.entity.config_entity import LDADataTransformationConfig
 from src.entity.config_entity import LDAModelTrainerConfig
 
+def rebase_artifacts(config: ConfigBox, artifacts_root: str, new_root: str):
+    '''
+    Move every path of the given config under artifacts_root to new_root, in place.
+    '''
+    for key, value in config.items():
+        if isinstance(value, dict):
+            rebase_artifacts(value, artifacts_root, new_root)
+
+        elif isinstance(value, str) and (value == artifacts_root or value.startswith(artifacts_root + '/')):
+            config[key] = new_root + value[len(artifacts_root):]
+
+def create_run_context(config_filepath=CONFIG_FILE_PATH, params_filepath=PARAMETERS_FILE_PATH, artifacts_root=None, sample=None, name='default') -> RunContext:
+    '''
+    Read the config and params of a run. Every artifact path is moved under artifacts_root when it is given,
+    otherwise under the sample artifacts root in sample runs, so runs never overwrite each other's artifacts.
+    sample=None follows the sample mode of the config.
+    '''
+    config = read_yaml(config_filepath)
+    params = read_yaml(params_filepath)
+
+    config.sample.enabled = config.sample.enabled if sample is None else sample
+
+    if artifacts_root is None and config.sample.enabled:
+        artifacts_root = config.sample.artifacts_root
+
+    if artifacts_root is not None:
+        rebase_artifacts(config, config.artifacts_root, str(Path(artifacts_root)))
+
+    return RunContext(name=name, config=config, params=params, artifacts_root=Path(config.artifacts_root))
+
 class ConfigurationManager:
-    def __init__(self, config_filepath=CONFIG_FILE_PATH, params_filepath=PARAMETERS_FILE_PATH):
-        self.config = read_yaml(config_filepath)
-        self.params = read_yaml(params_filepath)
+    def __init__(self, config_filepath=CONFIG_FILE_PATH, params_filepath=PARAMETERS_FILE_PATH, sample=None, artifacts_root=None, context: RunContext = None):
+        # the run context carries the config, params and artifacts root of a run
+        self.context = context or create_run_context(config_filepath, params_filepath, artifacts_root, sample)
+        self.config = self.context.config
+        self.params = self.context.params
+        self.sample = self.config.sample.enabled
 
         # create artifacts and lda root directory
         create_directories([self.config.artifacts_root, self.config.lda.root_dir])
 
     def get_data_ingestion_config(self) -> DataIngestionConfig:
         config = self.config.data_ingestion
+        sample = self.config.sample
 
         data_ingestion_config = DataIngestionConfig(
             source_dir=config.source_dir,
             dest_dir=config.dest_dir,
-            dest_filename=config.dest_filename
+            dest_filename=config.dest_filename,
+            layout=config.layout,
+            star_dir=config.star_dir,
+            incremental=config.incremental,
+            partitions_dir=config.partitions_dir,
+            state_filename=config.state_filename,
+            sample_fraction=sample.fraction if self.sample else None,
+            sample_max_orders=sample.max_orders if self.sample else None,
+            sample_seed=sample.seed
         )
 
         return data_ingestion_config
     
     def get_data_preprocessing_config(self) -> DataPreprocessingConfig:
         config = self.config.data_preprocessing
+        params = self.params.data_preprocessing_params
 
         data_preprocessing_config = DataPreprocessingConfig(
             dest_dir=config.dest_dir,
             dest_filename=config.dest_filename,
-            source_data_path=config.source_data_path
+            source_data_path=config.source_data_path,
+            labels_store_path=config.labels_store_path,
+            partitions_dir=config.partitions_dir,
+            source_layout=self.config.data_ingestion.layout,
+            source_star_dir=self.config.data_ingestion.star_dir,
+            incremental=self.config.data_ingestion.incremental,
+            source_partitions_dir=self.config.data_ingestion.partitions_dir,
+            predict_pipeline=self.get_predict_pipeline_config(),
+            n_jobs=params.n_jobs
         )
 
         return data_preprocessing_config
+
+    def get_predict_pipeline_config(self) -> PredictPipelineConfig:
+        # artifacts of the lda model trainer and data transformation of this run
+        model_trainer = self.config.lda.model_trainer
+        data_transformation = self.config.lda.data_transformation
+
+        predict_pipeline_config = PredictPipelineConfig(
+            model_path=Path(model_trainer.dest_dir) / model_trainer.model_filename,
+            compact_model_path=Path(model_trainer.dest_dir) / model_trainer.compact_model_filename,
+            preprocessor_path=Path(data_transformation.dest_dir) / data_transformation.transformer_obj_filename,
+            lookup_path=Path(model_trainer.dest_dir) / model_trainer.lookup_filename
+        )
+
+        return predict_pipeline_config
     
+    def get_geo_features_config(self) -> GeoFeaturesConfig:
+        config = self.config.geo_features
+
+        # with incremental ingestion, items are read from all partitions
+        source_data_path = config.source_data_path
+        if self.config.data_ingestion.incremental:
+            source_data_path = self.config.data_ingestion.partitions_dir
+
+        geo_features_config = GeoFeaturesConfig(
+            dest_dir=config.dest_dir,
+            distances_filename=config.distances_filename,
+            index_filename=config.index_filename,
+            source_data_path=source_data_path,
+            source_layout=self.config.data_ingestion.layout,
+            source_star_dir=self.config.data_ingestion.star_dir
+        )
+
+        return geo_features_config
+
+    def get_dashboard_database_config(self) -> DashboardDatabaseConfig:
+        config = self.config.dashboard_database
+
+        dashboard_database_config = DashboardDatabaseConfig(
+            dest_dir=config.dest_dir,
+            database_filename=config.database_filename,
+            manifest_filename=config.manifest_filename,
+            source_data_path=config.source_data_path
+        )
+
+        return dashboard_database_config
+
     def get_lda_data_ingestion_config(self) -> LDADataIngestionConfig:
         config = self.config.lda.data_ingestion
+        params = self.params.lda_data_ingestion_params
+
+        # with the star layout, reviews are read straight from the reviews table
+        # and with incremental ingestion, from all partitions
+        source_data_path = config.source_data_path
+        if self.config.data_ingestion.incremental:
+            source_data_path = self.config.data_ingestion.partitions_dir
+        elif self.config.data_ingestion.layout == 'star':
+            source_data_path = Path(self.config.data_ingestion.star_dir) / STAR_REVIEWS_FILENAME
 
         data_ingestion_config = LDADataIngestionConfig(
             dest_dir=config.dest_dir,
             dest_filename=config.dest_filename,
             dest_train_filename=config.dest_train_filename,
             dest_test_filename=config.dest_test_filename,
-            source_data_path=config.source_data_path
+            source_data_path=source_data_path,
+            test_size=params.test_size,
+            chunk_size=params.chunk_size
         )
 
         return data_ingestion_config
@@ -67,7 +182,8 @@ class ConfigurationManager:
             max_features=params.max_features,
             custom_stop_words=params.custom_stop_words,
             typos_correction=params.typos_correction,
-            words_substitution=params.words_substitution
+            words_substitution=params.words_substitution,
+            preprocessing_output=params.preprocessing_output
         )
 
         return data_transformation_config
@@ -79,12 +195,23 @@ class ConfigurationManager:
         model_trainer_config = LDAModelTrainerConfig(
             dest_dir=config.dest_dir,
             model_filename=config.model_filename,
+            compact_model_filename=config.compact_model_filename,
+            lookup_filename=config.lookup_filename,
+            checkpoint_filename=config.checkpoint_filename,
+            perplexities_filename=config.perplexities_filename,
             train_data_path=config.train_data_path,
             test_data_path=config.test_data_path,
             n_components=params.n_components,
             doc_prior=params.doc_prior,
             word_prior=params.word_prior,
-            max_iter=params.max_iter
+            max_iter=params.max_iter,
+            learning_method=params.learning_method,
+            batch_size=params.batch_size,
+            n_jobs=params.n_jobs,
+            evaluate_every=params.evaluate_every,
+            perp_tol=params.perp_tol,
+            checkpoint_every=params.checkpoint_every,
+            lookup_max_terms=params.lookup_max_terms
         )
 
         return model_trainer_config
\ No newline at end of file
@@ -4,6 +4,23 @@ from pathlib import Path
 CONFIG_FILE_PATH = Path('config/config.yaml')
 PARAMETERS_FILE_PATH = Path('config/params.yaml')
 
+# default artifacts root, the paths below are moved under another root by sample runs
+ARTIFACTS_ROOT = Path('artifacts')
+
 # LDA
-LDA_PREPROCESSOR_PATH = Path('artifacts/lda/data_tranformation/lda_tranformer.pkl')
-LDA_MODEL_PATH = Path('artifacts/lda/lda_model.pkl')
\ No newline at end of file
+LDA_PREPROCESSOR_PATH = ARTIFACTS_ROOT / 'lda/data_tranformation/lda_tranformer.pkl'
+LDA_MODEL_PATH = ARTIFACTS_ROOT / 'lda/lda_model.pkl'
+LDA_COMPACT_MODEL_PATH = ARTIFACTS_ROOT / 'lda/lda_model_float32.pkl'
+LDA_LOOKUP_PATH = ARTIFACTS_ROOT / 'lda/lda_lookup.pkl'
+
+# DASHBOARD
+DASHBOARD_DATABASE_PATH = ARTIFACTS_ROOT / 'dashboard/dashboard.db'
+DASHBOARD_MANIFEST_PATH = ARTIFACTS_ROOT / 'dashboard/manifest.json'
+PREPARED_DATA_PATH = ARTIFACTS_ROOT / 'data_preprocessing/data.csv'
+ALL_PERIODS = -1
+
+# DATA INGESTION STAR LAYOUT, all tables keyed by the integer order_key
+STAR_ORDERS_FILENAME = 'orders.csv'
+STAR_ITEMS_FILENAME = 'order_items.csv'
+STAR_PAYMENTS_FILENAME = 'order_payments.csv'
+STAR_REVIEWS_FILENAME = 'order_reviews.csv'
\ No newline at end of file
@@ -1,19 +1,69 @@
 from dataclasses import dataclass
 from pathlib import Path
 
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from box import ConfigBox
+
+@dataclass(frozen=True)
+class RunContext:
+    name: str
+    config: ConfigBox
+    params: ConfigBox
+    artifacts_root: Path
 
 @dataclass(frozen=True)
 class DataIngestionConfig:
     source_dir: Path
     dest_dir: Path
     dest_filename: str
+    layout: str
+    star_dir: Path
+    incremental: bool
+    partitions_dir: Path
+    state_filename: str
+
+    sample_fraction: Optional[float]
+    sample_max_orders: Optional[int]
+    sample_seed: int
+
+@dataclass(frozen=True)
+class PredictPipelineConfig:
+    model_path: Path
+    compact_model_path: Path
+    preprocessor_path: Path
+    lookup_path: Path
 
 @dataclass(frozen=True)
 class DataPreprocessingConfig:
     dest_dir: Path
     dest_filename: str
     source_data_path: Path
+    labels_store_path: Path
+    partitions_dir: Path
+    source_layout: str
+    source_star_dir: Path
+    incremental: bool
+    source_partitions_dir: Path
+    predict_pipeline: PredictPipelineConfig
+
+    n_jobs: int
+
+@dataclass(frozen=True)
+class GeoFeaturesConfig:
+    dest_dir: Path
+    distances_filename: str
+    index_filename: str
+    source_data_path: Path
+    source_layout: str
+    source_star_dir: Path
+
+@dataclass(frozen=True)
+class DashboardDatabaseConfig:
+    dest_dir: Path
+    database_filename: str
+    manifest_filename: str
+    source_data_path: Path
 
 @dataclass(frozen=True)
 class LDADataIngestionConfig:
@@ -23,6 +73,9 @@ class LDADataIngestionConfig:
     dest_test_filename: str
     source_data_path: Path
 
+    test_size: float
+    chunk_size: int
+
 @dataclass(frozen=True)
 class LDADataTransformationConfig:
     dest_dir: Path
@@ -39,15 +92,27 @@ class LDADataTransformationConfig:
     custom_stop_words: List[str]
     typos_correction: Dict[str, str]
     words_substitution: Dict[str, List[str]]
+    preprocessing_output: str
 
 @dataclass(frozen=True)
 class LDAModelTrainerConfig:
     dest_dir: Path
     model_filename: str
+    compact_model_filename: str
+    lookup_filename: str
+    checkpoint_filename: str
+    perplexities_filename: str
     train_data_path: Path
     test_data_path: Path
 
     n_components: int
     doc_prior: float
     word_prior: float
-    max_iter: int
\ No newline at end of file
+    max_iter: int
+    learning_method: str
+    batch_size: int
+    n_jobs: int
+    evaluate_every: int
+    perp_tol: float
+    checkpoint_every: int
+    lookup_max_terms: int
\ No newline at end of file
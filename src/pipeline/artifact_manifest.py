@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from src.utils.common import atomic_write, hash_files
+from src.utils import logger
+
+def write_manifest(manifest_path: Path, artifact_path: Path, version: str = None, versions: List[str] = None) -> str:
+    '''
+    Write the manifest of an artifact, with its content hash as version.
+
+    Args
+    ----
+    manifest_path : Path
+        Path of the json manifest.
+
+    artifact_path : Path
+        Path of the artifact, saved in the manifest relative to the manifest directory.
+
+    version : str
+        Content hash of the artifact, computed when not given.
+
+    versions : List[str]
+        Filenames of the versions kept, newest first, saved when given.
+
+    Returns
+    -------
+    str
+        Version of the artifact.
+    '''
+    manifest_path, artifact_path = Path(manifest_path), Path(artifact_path)
+
+    manifest = {
+        'version': hash_files([artifact_path]) if version is None else version,
+        'filename': artifact_path.name if artifact_path.parent == manifest_path.parent else str(artifact_path),
+        'created_at': datetime.now().isoformat(timespec='seconds')
+    }
+    if versions is not None:
+        manifest['versions'] = versions
+
+    with atomic_write(manifest_path) as tmp_path:
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+
+    return manifest['version']
+
+@contextmanager
+def versioned_write(manifest_path: Path, file_path: Path, keep_versions: int = 2) -> Iterator[Path]:
+    '''
+    Yield a temporary path to write an artifact to. Once the block succeeds, the artifact is moved to
+    a file named by its content hash, like dashboard-<hash>.db, and the manifest is pointed to it.
+    Versions are never overwritten, so readers of a manifest always find the content of its version.
+    Just the newest keep_versions versions are kept, older ones are removed after the manifest is replaced.
+
+    Args
+    ----
+    manifest_path : Path
+        Path of the json manifest.
+
+    file_path : Path
+        Path of the artifact without version, like dashboard.db.
+
+    keep_versions : int
+        Versions kept, the previous ones are still read by readers that loaded an older manifest.
+
+    Returns
+    -------
+    Iterator[Path]
+        The temporary path to write to.
+    '''
+    file_path = Path(file_path)
+    tmp_path = file_path.with_name(f'.{file_path.name}.{os.getpid()}.tmp')
+
+    try:
+        yield tmp_path
+
+        version = hash_files([tmp_path])
+        versioned_path = file_path.with_name(f'{file_path.stem}-{version}{file_path.suffix}')
+        os.replace(tmp_path, versioned_path)
+
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    # versions of the previous manifests, newest first, file times may be equal for quick writes
+    try:
+        previous = json.loads(Path(manifest_path).read_text())
+        previous_versions = previous.get('versions', [previous['filename']])
+    except (OSError, ValueError, KeyError):
+        previous_versions = []
+
+    versions = list(dict.fromkeys([versioned_path.name] + previous_versions))[:max(keep_versions, 1)]
+    write_manifest(manifest_path, versioned_path, version, versions)
+
+    old_versions = [path for path in file_path.parent.glob(f'{file_path.stem}-*{file_path.suffix}') if path.name not in versions]
+
+    for old_version in old_versions:
+        logger.info(f'removing old artifact version: {old_version}')
+        old_version.unlink(missing_ok=True)
+
+def read_manifest(manifest_path: Path) -> Optional[Tuple[str, Path]]:
+    '''
+    Version and path of the artifact of a manifest, None when there is no valid manifest.
+    '''
+    manifest_path = Path(manifest_path)
+
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        return manifest['version'], manifest_path.parent / manifest['filename']
+
+    except (OSError, ValueError, KeyError):
+        return None
+
+class ArtifactReloader:
+    '''
+    ArtifactReloader
+    ----------------
+    Keeps the loaded version of an artifact and loads newer versions in a background thread.
+    Readers keep the current version until the new one is loaded, then it is swapped in and
+    the old version is released. Just the first load blocks.
+
+    Attributes
+    ----------
+    load : Callable[[Path], Any]
+        Loads the artifact at the given path.
+
+    resolve : Callable[[], Tuple[str, Path]]
+        Version and path of the latest artifact, cheap, called on every get.
+
+    on_swap : Callable[[str], None]
+        Called with the new version after it is swapped in, to release caches of older versions.
+    '''
+
+    def __init__(self, load: Callable[[Path], Any], resolve: Callable[[], Tuple[str, Path]], on_swap: Callable[[str], None] = None) -> None:
+        self.load = load
+        self.resolve = resolve
+        self.on_swap = on_swap
+
+        self.__lock = threading.Lock()
+        self.__current = None
+        self.__loading_version = None
+        self.__failed_version = None
+
+    def get(self) -> Tuple[str, Any]:
+        '''
+        Current version and artifact, starts loading the latest version when it is new.
+        '''
+        version, path = self.resolve()
+
+        with self.__lock:
+            current = self.__current
+
+            # one load at a time, a version newer than the loading one is loaded after it
+            if current is not None and (version in (current[0], self.__failed_version) or self.__loading_version is not None):
+                return current
+
+            if current is not None:
+                self.__loading_version = version
+
+        # first load, nothing to show meanwhile
+        if current is None:
+            artifact = self.load(path)
+
+            with self.__lock:
+                # a concurrent first load may have finished before
+                if self.__current is None:
+                    self.__current = (version, artifact)
+
+                return self.__current
+
+        threading.Thread(target=self.__load_version, args=(version, path), daemon=True).start()
+        return current
+
+    def __load_version(self, version: str, path: Path):
+        try:
+            artifact = self.load(path)
+
+        except Exception as e:
+            logger.error(f'failed loading version {version} of {path}, keeping the current version: {e}')
+
+            with self.__lock:
+                self.__loading_version = None
+                self.__failed_version = version
+
+            return
+
+        with self.__lock:
+            # the old version is released once the readers using it finish
+            self.__current = (version, artifact)
+            self.__loading_version = None
+
+        logger.info(f'loaded version {version} of {path}.')
+
+        if self.on_swap is not None:
+            self.on_swap(version)
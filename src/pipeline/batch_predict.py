@@ -0,0 +1,221 @@
+import argparse
+import os
+import time
+from collections import deque
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Iterator, List
+
+import pandas as pd
+
+from src.constants import CONFIG_FILE_PATH, PARAMETERS_FILE_PATH
+from src.entity.config_entity import PredictPipelineConfig
+from src.utils.exception import CustomException
+from src.utils import logger, setup_logging
+
+# PredictPipeline of each worker process, loaded once by the pool initializer
+_worker_pipeline = None
+
+def _init_worker(predict_config: PredictPipelineConfig = None, fast_inference: bool = False):
+    global _worker_pipeline
+
+    # imported here, so the command line starts without loading the model dependencies
+    from src.pipeline.predict_pipeline import PredictPipeline
+
+    _worker_pipeline = PredictPipeline(predict_config, fast_inference=fast_inference)
+
+def _predict_chunk(chunk: pd.DataFrame, column: str) -> pd.DataFrame:
+    '''
+    Add the complaint type of the reviews in column to the chunk, null or empty reviews have no complaint.
+    '''
+    reviews = chunk[column]
+    complaints = pd.Series(None, index=reviews.index, dtype=object)
+
+    # all null columns of json and parquet files are read with other dtypes
+    valid_reviews = reviews.dropna().astype('string')
+    valid_reviews = valid_reviews[valid_reviews.str.strip() != '']
+
+    if not valid_reviews.empty:
+        complaints[valid_reviews.index] = _worker_pipeline.predict_review(valid_reviews)
+
+    return chunk.assign(complaint=complaints)
+
+def read_reviews(input_path: Path, column: str, chunk_size: int, keep_columns: List[str] = None) -> Iterator[pd.DataFrame]:
+    '''
+    Read the reviews column of a CSV, JSONL or Parquet file, chunk by chunk, as text.
+
+    Args
+    ----
+    input_path : Path
+        CSV, JSONL or Parquet file with reviews.
+
+    column : str
+        Name of the reviews column.
+
+    chunk_size : int
+        Number of rows of each chunk.
+
+    keep_columns : List[str]
+        Other columns read with the reviews, all of them if empty, none if None.
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        Chunks with the kept columns and the reviews column, in file order.
+    '''
+    suffix = Path(input_path).suffix.lower()
+
+    # None reads every column
+    columns = None if keep_columns == [] else list(dict.fromkeys((keep_columns or []) + [column]))
+
+    if suffix == '.csv':
+        # read as written, numbers are not parsed and formatted back
+        for chunk in pd.read_csv(input_path, usecols=columns, dtype={ column: str }, chunksize=chunk_size):
+            yield chunk
+
+    elif suffix in ('.jsonl', '.json'):
+        for chunk in pd.read_json(input_path, lines=True, dtype={ column: str }, chunksize=chunk_size):
+            yield chunk if columns is None else chunk[columns]
+
+    elif suffix == '.parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size, columns=columns):
+            index = batch.schema.get_field_index(column)
+            yield batch.set_column(index, column, batch.column(index).cast(pa.string())).to_pandas()
+
+    else:
+        raise CustomException(f'unsupported reviews file format: {input_path}')
+
+def predict_chunks(pool: Pool, chunks: Iterator[pd.DataFrame], column: str, max_pending: int) -> Iterator[pd.DataFrame]:
+    '''
+    Predict chunks in the pool, in input order. At most max_pending chunks are read ahead of the
+    written ones, so memory stays bounded on large inputs.
+    '''
+    pending = deque()
+
+    for chunk in chunks:
+        pending.append(pool.apply_async(_predict_chunk, (chunk, column)))
+
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+
+    while pending:
+        yield pending.popleft().get()
+
+def write_results(output_path: Path, results: pd.DataFrame, first_chunk: bool):
+    '''
+    Append results to a CSV or JSONL file.
+    '''
+    if Path(output_path).suffix.lower() in ('.jsonl', '.json'):
+        with open(output_path, 'w' if first_chunk else 'a', encoding='utf-8') as file:
+            if not results.empty:
+                file.write(results.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n') + '\n')
+    else:
+        results.to_csv(output_path, mode='w' if first_chunk else 'a', index=False, header=first_chunk)
+
+def score_reviews(input_path: Path, output_path: Path, column: str, workers: int = 1, chunk_size: int = 1000, fast_inference: bool = False, predict_config: PredictPipelineConfig = None, keep_columns: List[str] = None):
+    '''
+    Predict the complaint type of every review in input_path and write them to output_path, in input order.
+
+    Args
+    ----
+    input_path : Path
+        CSV, JSONL or Parquet file with reviews.
+
+    output_path : Path
+        CSV or JSONL file to write the reviews and their complaint types.
+
+    column : str
+        Name of the reviews column.
+
+    workers : int
+        Number of worker processes, each one holds its own PredictPipeline.
+
+    chunk_size : int
+        Number of reviews sent to a worker at a time.
+
+    fast_inference : bool
+        Use the approximate LDA inference of PredictPipeline.
+
+    predict_config : PredictPipelineConfig
+        Paths of the model artifacts, the ones of config/config.yaml by default.
+
+    keep_columns : List[str]
+        Input columns written with the reviews, like an id to join the complaints back to the input.
+        All of them if empty, none if None.
+    '''
+    try:
+        logger.info(f'scoring reviews from {input_path} with {workers} workers.')
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        chunks = read_reviews(input_path, column, chunk_size, keep_columns)
+
+        if workers > 1:
+            pool = Pool(processes=workers, initializer=_init_worker, initargs=(predict_config, fast_inference))
+            # two chunks per worker keep every worker busy while results are written
+            predictions = predict_chunks(pool, chunks, column, max_pending=2 * workers)
+        else:
+            pool = None
+            _init_worker(predict_config, fast_inference)
+            predictions = (_predict_chunk(chunk, column) for chunk in chunks)
+
+        start = time.perf_counter()
+        rows_count = 0
+        first_chunk = True
+
+        try:
+            for results in predictions:
+                write_results(output_path, results, first_chunk)
+                first_chunk = False
+
+                rows_count += results.shape[0]
+                logger.info(f'{rows_count} reviews scored, {rows_count / (time.perf_counter() - start):.1f} rows/sec.')
+
+            # empty inputs still get an output, with just the header
+            if first_chunk:
+                columns = list(dict.fromkeys((keep_columns or []) + [column, 'complaint']))
+                write_results(output_path, pd.DataFrame(columns=columns), True)
+
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        elapsed = time.perf_counter() - start
+        logger.info(f'scored {rows_count} reviews in {elapsed:.1f}s ({rows_count / max(elapsed, 1e-9):.1f} rows/sec), results at {output_path}.')
+
+    except Exception as e:
+        raise CustomException(e)
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description='Predict the complaint type (Product, Delivery or Inconclusive) of reviews in a CSV, JSONL or Parquet file.')
+    parser.add_argument('input', type=Path, help='CSV, JSONL or Parquet file with reviews.')
+    parser.add_argument('output', type=Path, help='CSV or JSONL file to write the results.')
+    parser.add_argument('--column', default='reviews', help='name of the reviews column (default: reviews).')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes (default: cpu count).')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='reviews sent to a worker at a time (default: 1000).')
+    parser.add_argument('--keep-columns', nargs='*', default=None, metavar='COLUMN',
+                        help='input columns written with the results, like an id column. All of them when given without names.')
+    parser.add_argument('--fast', action='store_true', help='use the approximate LDA inference.')
+    parser.add_argument('--config', default=CONFIG_FILE_PATH, help=f'config file of the run that trained the model (default: {CONFIG_FILE_PATH}).')
+    parser.add_argument('--params', default=PARAMETERS_FILE_PATH, help=f'params file of the run (default: {PARAMETERS_FILE_PATH}).')
+    parser.add_argument('--artifacts-root', default=None, help='artifacts root of the run that trained the model, replacing the one of the config.')
+    parsed = parser.parse_args(args)
+
+    setup_logging()
+
+    # imported here, so --help does not read the config
+    from src.config.configuration import create_run_context, ConfigurationManager
+
+    context = create_run_context(parsed.config, parsed.params, artifacts_root=parsed.artifacts_root)
+    predict_config = ConfigurationManager(context=context).get_predict_pipeline_config()
+
+    score_reviews(parsed.input, parsed.output, parsed.column, parsed.workers, parsed.chunk_size, parsed.fast, predict_config, parsed.keep_columns)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+from src.constants import ALL_PERIODS
+from src.utils.exception import CustomException
+from src.utils.common import month_period_to_date
+from src.pipeline.delivery_metrics import summarize_deliveries
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+METRICS_COLUMNS = [
+    'orders_count', 'orders_pendent', 'orders_delivered', 'orders_late', 'orders_avarage_late_delivery_time',
+    'scores_mean', 'product_complaints', 'delivery_complaints'
+]
+
+def compute_period_metrics(data: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Compute every dashboard metric for each purchase period and for the whole dataset.
+
+    Args
+    ----
+    data : pd.DataFrame
+        Prepared data, with purchase_period and the delivery columns or the parsed delivery dates.
+
+    Returns
+    -------
+    pd.DataFrame
+        Metrics indexed by purchase_period, the whole dataset is at ALL_PERIODS.
+    '''
+    try:
+        # rows metrics
+        rows_stats = pd.DataFrame({
+            'purchase_period': data.purchase_period,
+            'orders_count': 1,
+            'scores_sum': data.review_score.fillna(0),
+            'scores_count': data.review_score.notna(),
+            'product_complaints': data.complaint == 'Product',
+            'delivery_complaints': data.complaint == 'Delivery'
+        }).groupby('purchase_period').sum()
+
+        # orders metrics, one row per order
+        orders = data.drop_duplicates(subset=['order_id'])
+        orders_stats = summarize_deliveries(orders, by='purchase_period')
+
+        # sums of each period, then the whole dataset
+        metrics = rows_stats.join(orders_stats, how='left').fillna(0)
+        metrics.loc[ALL_PERIODS] = metrics.sum()
+        metrics.sort_index(inplace=True)
+
+        metrics['orders_pendent'] = metrics.orders_count - metrics.orders_delivered
+        metrics['orders_avarage_late_delivery_time'] = np.where(
+            metrics.orders_late > 0, metrics.late_days_sum / metrics.orders_late.clip(lower=1), 0)
+        metrics['scores_mean'] = metrics.scores_sum / metrics.scores_count.replace(0, np.nan)
+
+        metrics = metrics[METRICS_COLUMNS]
+        int_columns = [column for column in METRICS_COLUMNS if column != 'scores_mean']
+        metrics[int_columns] = metrics[int_columns].astype(np.int64)
+
+        return metrics
+
+    except Exception as e:
+        raise CustomException(e)
+
+class DashboardMetrics:
+    '''
+    DashboardMetrics
+    ----------------
+    Dashboard metrics looked up from the precomputed metrics of each purchase
+    period. Periods are integer month periods (year * 12 + month - 1), None
+    selects the whole dataset.
+
+    Attributes
+    ----------
+    metrics : pd.DataFrame
+        Metrics indexed by purchase_period, as returned by compute_period_metrics.
+    '''
+
+    def __init__(self, metrics: pd.DataFrame):
+        self.metrics = metrics
+
+        periods = metrics.index[metrics.index != ALL_PERIODS]
+        self.__orders_volume = pd.DataFrame({
+            'date': month_period_to_date(periods) + pd.offsets.MonthEnd(0),
+            'period': periods,
+            'volume': metrics.loc[periods, 'orders_count'].to_numpy()
+        })
+
+    @classmethod
+    def from_database(cls, database_path: Path) -> 'DashboardMetrics':
+        try:
+            with closing(sqlite3.connect(f'file:{database_path}?mode=ro', uri=True)) as connection:
+                metrics = pd.read_sql('SELECT * FROM metrics', connection, index_col='purchase_period')
+
+            return cls(metrics)
+
+        except Exception as e:
+            raise CustomException(e)
+
+    @classmethod
+    def from_dataset(cls, data: pd.DataFrame) -> 'DashboardMetrics':
+        return cls(compute_period_metrics(data))
+
+    def __row(self, period: Optional[int]) -> pd.Series:
+        return self.metrics.loc[ALL_PERIODS if period is None else period]
+
+    def purchase_periods(self) -> List[int]:
+        return self.__orders_volume.period.tolist()
+
+    def orders_volume(self) -> pd.DataFrame:
+        return self.__orders_volume
+
+    def order_delivery_details(self, period: Optional[int]) -> List[int]:
+        row = self.__row(period)
+        return [int(row[column]) for column in METRICS_COLUMNS[:5]]
+
+    def scores_mean(self, period: Optional[int]) -> float:
+        return float(self.__row(period).scores_mean)
+
+    def count_reviews_topic(self, period: Optional[int]) -> List[int]:
+        row = self.__row(period)
+        return int(row.product_complaints), int(row.delivery_complaints)
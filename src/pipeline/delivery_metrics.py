@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# compact delivery columns stored in the prepared data, one value per row
+DELIVERY_COLUMNS = ['is_late', 'late_days']
+
+def compute_delivery_lateness(delivered_dates: pd.Series, estimated_dates: pd.Series):
+    '''
+    Day level lateness of deliveries, computed with integer arithmetic on datetime64 arrays.
+    A delivery is late when it happens in a day after the estimated day, missing dates are never late.
+
+    Args
+    ----
+    delivered_dates : pd.Series
+        Datetime series of customer delivery dates.
+
+    estimated_dates : pd.Series
+        Datetime series of estimated delivery dates.
+
+    Returns
+    -------
+    is_late : np.ndarray
+        Bool array, true for late deliveries.
+
+    late_days : np.ndarray
+        Int16 array of whole days between the estimated and the delivered dates, 0 for deliveries not late.
+    '''
+    delivered = pd.to_datetime(delivered_dates).to_numpy(dtype='datetime64[s]')
+    estimated = pd.to_datetime(estimated_dates).to_numpy(dtype='datetime64[s]')
+    has_dates = ~(np.isnat(delivered) | np.isnat(estimated))
+
+    # seconds since epoch, NaT are masked by has_dates
+    delivered = delivered.view(np.int64)
+    estimated = estimated.view(np.int64)
+
+    is_late = has_dates & (delivered // SECONDS_PER_DAY > estimated // SECONDS_PER_DAY)
+    late_days = np.where(is_late, (delivered - estimated) // SECONDS_PER_DAY, 0).astype(np.int16)
+
+    return is_late, late_days
+
+def add_delivery_columns(data: pd.DataFrame):
+    '''
+    Add the is_late and late_days columns to the given data, in place.
+
+    Args
+    ----
+    data : pd.DataFrame
+        Data with order_delivered_customer_date and order_estimated_delivery_date.
+    '''
+    data['is_late'], data['late_days'] = compute_delivery_lateness(
+        data.order_delivered_customer_date,
+        data.order_estimated_delivery_date
+    )
+
+def summarize_deliveries(orders: pd.DataFrame, by: str) -> pd.DataFrame:
+    '''
+    Delivered and late orders counts and the sum of late days of each group.
+
+    Args
+    ----
+    orders : pd.DataFrame
+        Orders, one row per order, with order_status and the delivery columns, computed if missing.
+
+    by : str
+        Column to group orders by.
+
+    Returns
+    -------
+    pd.DataFrame
+        orders_delivered, orders_late and late_days_sum indexed by the group.
+    '''
+    if not set(DELIVERY_COLUMNS).issubset(orders.columns):
+        is_late, late_days = compute_delivery_lateness(orders.order_delivered_customer_date, orders.order_estimated_delivery_date)
+    else:
+        is_late, late_days = orders.is_late.to_numpy(dtype=bool), orders.late_days.to_numpy()
+
+    return pd.DataFrame({
+        by: orders[by].to_numpy(),
+        'orders_delivered': (orders.order_status == 'delivered').to_numpy(),
+        'orders_late': is_late,
+        'late_days_sum': late_days.astype(np.int64)
+    }).groupby(by).sum()
@@ -0,0 +1,107 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# mean earth radius
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    '''
+    Great circle distance between the given points, computed for all points at once.
+
+    Args
+    ----
+    lat1, lon1 : array-like
+        Latitudes and longitudes of the first points, in degrees.
+
+    lat2, lon2 : array-like
+        Latitudes and longitudes of the second points, in degrees.
+
+    Returns
+    -------
+    np.ndarray
+        Distances in kilometers, NaN where a coordinate is missing.
+    '''
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(values, dtype=np.float64)) for values in (lat1, lon1, lat2, lon2))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+class SellerIndex:
+    '''
+    SellerIndex
+    -----------
+    BallTree over the unique seller locations, zip prefix centroids, to query sellers
+    near a location. Sellers of centroid i are seller_ids[offsets[i]:offsets[i + 1]].
+
+    Attributes
+    ----------
+    tree : BallTree
+        Haversine BallTree over the centroids, in radians.
+
+    centroids : np.ndarray
+        Latitude and longitude of each centroid, in degrees.
+
+    seller_ids : np.ndarray
+        Seller ids sorted by centroid.
+
+    offsets : np.ndarray
+        Start of the sellers of each centroid in seller_ids.
+    '''
+
+    def __init__(self, tree, centroids: np.ndarray, seller_ids: np.ndarray, offsets: np.ndarray) -> None:
+        self.tree = tree
+        self.centroids = centroids
+        self.seller_ids = seller_ids
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, sellers: pd.DataFrame) -> 'SellerIndex':
+        '''
+        Build the index from sellers with seller_id, mean_lat_seller and mean_lon_seller, sellers without location are ignored.
+        '''
+        from sklearn.neighbors import BallTree
+
+        sellers = sellers[['seller_id', 'mean_lat_seller', 'mean_lon_seller']].dropna().drop_duplicates(subset=['seller_id'])
+
+        # unique centroids, sellers grouped by centroid
+        centroids, codes = np.unique(sellers[['mean_lat_seller', 'mean_lon_seller']].to_numpy(), axis=0, return_inverse=True)
+        codes = codes.ravel()
+        order = np.argsort(codes, kind='stable')
+
+        offsets = np.zeros(centroids.shape[0] + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(codes, minlength=centroids.shape[0]))
+
+        tree = BallTree(np.radians(centroids), metric='haversine')
+
+        return cls(tree, centroids, sellers.seller_id.to_numpy()[order], offsets)
+
+    def sellers_at(self, centroids) -> List[np.ndarray]:
+        return [self.seller_ids[self.offsets[i]:self.offsets[i + 1]] for i in centroids]
+
+    def query_radius(self, lat, lon, radius_km: float) -> List[np.ndarray]:
+        '''
+        Sellers within radius_km of each given location.
+        '''
+        points = np.radians(np.column_stack([lat, lon]).astype(np.float64))
+        centroids = self.tree.query_radius(points, r=radius_km / EARTH_RADIUS_KM)
+
+        return [np.concatenate(self.sellers_at(point_centroids)) if len(point_centroids) else self.seller_ids[:0] for point_centroids in centroids]
+
+    def query_nearest(self, lat, lon, k=1):
+        '''
+        The k nearest centroids of each given location.
+
+        Returns
+        -------
+        distances : np.ndarray
+            Distances in kilometers of shape (n_points, k).
+
+        centroids : np.ndarray
+            Centroid indices of shape (n_points, k), their sellers are given by sellers_at.
+        '''
+        points = np.radians(np.column_stack([lat, lon]).astype(np.float64))
+        distances, centroids = self.tree.query(points, k=min(k, self.centroids.shape[0]))
+
+        return distances * EARTH_RADIUS_KM, centroids
@@ -0,0 +1,92 @@
+import argparse
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List
+
+from src.constants import CONFIG_FILE_PATH, PARAMETERS_FILE_PATH
+from src.utils.common import read_yaml
+from src.utils.exception import CustomException
+from src.utils import logger, setup_logging
+
+def run_configuration(run: dict) -> str:
+    '''
+    Run the pipeline of one configuration, in its own process and with its own artifacts root and logs.
+    '''
+    from src.config.configuration import ConfigurationManager, create_run_context
+    from src.pipeline.stages import run_stages
+
+    context = create_run_context(
+        run.get('config', CONFIG_FILE_PATH),
+        run.get('params', PARAMETERS_FILE_PATH),
+        artifacts_root=run['artifacts_root'],
+        sample=run.get('sample'),
+        name=run['name']
+    )
+
+    setup_logging(context.artifacts_root / 'logs')
+    logger.info(f'starting run {context.name} with artifacts at {context.artifacts_root}.')
+
+    run_stages(ConfigurationManager(context=context), run.get('stages'))
+
+    return context.name
+
+def launch_runs(runs: List[dict], processes: int = None) -> List[str]:
+    '''
+    Run the given configurations in parallel processes.
+
+    Args
+    ----
+    runs : List[dict]
+        Runs with name, artifacts_root and, optionally, config, params, sample and stages.
+
+    processes : int
+        Max parallel runs, one per run by default.
+
+    Returns
+    -------
+    List[str]
+        Names of the failed runs.
+    '''
+    names = [run['name'] for run in runs]
+    roots = [str(Path(run['artifacts_root']).resolve()) for run in runs]
+
+    # runs sharing a name or an artifacts root would overwrite each other
+    if len(set(names)) < len(names) or len(set(roots)) < len(roots):
+        raise CustomException('every run needs its own name and artifacts_root.')
+
+    failed = []
+
+    # spawned processes start without the logging handlers of the launcher
+    with ProcessPoolExecutor(max_workers=processes or len(runs), mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = { executor.submit(run_configuration, run): run['name'] for run in runs }
+
+        for future in as_completed(futures):
+            name = futures[future]
+
+            try:
+                future.result()
+                logger.info(f'run {name} finished.')
+
+            except Exception as e:
+                logger.error(f'run {name} failed: {e}')
+                failed.append(name)
+
+    return failed
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description='Run several pipeline configurations in parallel processes, each one with its own artifacts root.')
+    parser.add_argument('runs', type=Path, help='yaml file with the list of runs, like config/runs.yaml.')
+    parser.add_argument('--processes', type=int, default=None, help='max parallel runs (default: one process per run).')
+    parsed = parser.parse_args(args)
+
+    setup_logging()
+
+    runs = [dict(run) for run in read_yaml(parsed.runs).runs]
+    failed = launch_runs(runs, parsed.processes)
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
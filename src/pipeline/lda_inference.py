@@ -0,0 +1,233 @@
+import copy
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.special import psi
+
+def compact_csr(X, dtype=np.uint8) -> sp.csr_matrix:
+    '''
+    Document-term matrix with values in dtype and int32 indices, when they fit.
+
+    Args
+    ----
+    X : sparse matrix of shape (n_docs, n_features)
+        Binary document-term matrix.
+
+    dtype : np.dtype
+        Dtype of the values, small integers or bool for binary counts.
+
+    Returns
+    -------
+    sp.csr_matrix
+        The compact matrix.
+    '''
+    X = sp.csr_matrix(X, dtype=dtype)
+
+    if max(X.nnz, X.shape[1]) < np.iinfo(np.int32).max:
+        X.indices = X.indices.astype(np.int32, copy=False)
+        X.indptr = X.indptr.astype(np.int32, copy=False)
+
+    return X
+
+def compact_lda_model(lda_model, dtype=np.float32):
+    '''
+    Copy of the trained LDA model with its topic word matrices in dtype, the model itself is not changed.
+    Inference of the copy runs in dtype when the document-term matrix is given in dtype.
+    '''
+    if lda_model.components_.dtype == dtype and lda_model.exp_dirichlet_component_.dtype == dtype:
+        return lda_model
+
+    compact_model = copy.copy(lda_model)
+    compact_model.components_ = lda_model.components_.astype(dtype)
+    compact_model.exp_dirichlet_component_ = lda_model.exp_dirichlet_component_.astype(dtype)
+
+    return compact_model
+
+def fast_lda_transform(lda_model, X, max_iter=30, tol=1e-2, threshold=None, early_stop_margin=None) -> np.ndarray:
+    '''
+    Approximate LatentDirichletAllocation.transform, running the variational E-step
+    for all documents at once with NumPy and sparse matrix products.
+
+    Args
+    ----
+    lda_model : LatentDirichletAllocation
+        Trained LDA model.
+
+    X : sparse matrix of shape (n_docs, n_features)
+        Document-term matrix.
+
+    max_iter : int
+        Max E-step iterations per document.
+
+    tol : float
+        Documents stop updating when the mean change of their topic distribution is lower than tol.
+
+    threshold : float, optional
+        Topic margin threshold used to classify documents.
+
+    early_stop_margin : float, optional
+        If given with threshold, documents also stop updating once the margin between their
+        two main topics is greater than threshold + early_stop_margin.
+
+    Returns
+    -------
+    np.ndarray
+        Normalized document topic distribution of shape (n_docs, n_components), in the precision of the model.
+    '''
+    exp_topic_word = lda_model.exp_dirichlet_component_
+    doc_topic_prior = lda_model.doc_topic_prior_
+
+    # computed in the precision of the model
+    dtype = exp_topic_word.dtype
+    eps = np.finfo(dtype).eps
+
+    X = sp.csr_matrix(X, dtype=dtype)
+    doc_topic = np.ones((X.shape[0], exp_topic_word.shape[0]), dtype=dtype)
+
+    # documents with no words keep the uniform distribution, as in sklearn
+    active = np.flatnonzero(np.diff(X.indptr) > 0)
+
+    for _ in range(max_iter):
+        if active.shape[0] == 0:
+            break
+
+        X_active = X[active]
+        doc_topic_active = doc_topic[active]
+
+        # exp(E[log(theta)]) of each document
+        exp_doc_topic = np.exp(psi(doc_topic_active) - psi(doc_topic_active.sum(axis=1, keepdims=True)))
+
+        # normalizer of phi for each document word
+        rows = np.repeat(np.arange(active.shape[0]), np.diff(X_active.indptr))
+        norm_phi = np.einsum('ik,ki->i', exp_doc_topic[rows], exp_topic_word[:, X_active.indices]) + eps
+
+        ratio = sp.csr_matrix((X_active.data / norm_phi, X_active.indices, X_active.indptr), shape=X_active.shape)
+        new_doc_topic = exp_doc_topic * (ratio @ exp_topic_word.T) + doc_topic_prior
+
+        doc_topic[active] = new_doc_topic
+
+        # keep updating documents that did not converge
+        keep = np.mean(np.abs(new_doc_topic - doc_topic_active), axis=1) >= tol
+
+        if threshold is not None and early_stop_margin is not None and new_doc_topic.shape[1] > 1:
+            # margin between the two main topics
+            distr = new_doc_topic / new_doc_topic.sum(axis=1, keepdims=True)
+            top_two = np.partition(distr, -2, axis=1)[:, -2:]
+            keep &= (top_two[:, 1] - top_two[:, 0]) <= threshold + early_stop_margin
+
+        active = active[keep]
+
+    return doc_topic / doc_topic.sum(axis=1, keepdims=True)
+
+class TopicLookup:
+    '''
+    TopicLookup
+    -----------
+    Precomputed topic distribution of every document made of one or two binary
+    terms, the most common reviews after preprocessing. Single term i is stored at
+    i and the pair i < j at n_features + pair_offset(i) + j - i - 1, the upper
+    triangle of pairs in row order.
+
+    Attributes
+    ----------
+    topics : np.ndarray
+        Topic distribution of each key.
+
+    n_features : int
+        Vocabulary size of the model.
+
+    max_terms : int [1, 2]
+        Max number of terms of documents answered by the lookup.
+    '''
+
+    def __init__(self, topics: np.ndarray, n_features: int, max_terms: int) -> None:
+        self.topics = topics
+        self.n_features = n_features
+        self.max_terms = max_terms
+
+    @staticmethod
+    def n_keys(n_features: int, max_terms: int) -> int:
+        return n_features + n_features * (n_features - 1) // 2 if max_terms == 2 else n_features
+
+    def pair_offset(self, first):
+        # pairs before the ones starting at first
+        return first * (2 * self.n_features - first - 1) // 2
+
+    @classmethod
+    def build(cls, lda_model, max_terms=2) -> 'TopicLookup':
+        '''
+        Compute the topic distribution of all single terms and, if max_terms is 2, of all pairs of terms,
+        stored in the precision of the model.
+        '''
+        if max_terms not in (1, 2):
+            raise ValueError(f'max_terms must be 1 or 2, got {max_terms}')
+
+        n_features = lda_model.components_.shape[1]
+        dtype = lda_model.components_.dtype
+
+        topics = np.empty((cls.n_keys(n_features, max_terms), lda_model.components_.shape[0]), dtype=dtype)
+        topics[:n_features] = lda_model.transform(sp.identity(n_features, format='csr', dtype=dtype))
+
+        if max_terms == 2:
+            # row order of the upper triangle, the order of the pair keys
+            first, second = np.triu_indices(n_features, k=1)
+            n_pairs = first.shape[0]
+
+            pairs = sp.csr_matrix(
+                (np.ones(2 * n_pairs, dtype=dtype), np.column_stack([first, second]).ravel(), np.arange(0, 2 * n_pairs + 1, 2)),
+                shape=(n_pairs, n_features)
+            )
+            topics[n_features:] = lda_model.transform(pairs)
+
+        return cls(topics, n_features, max_terms)
+
+    def check(self, n_features: int):
+        '''
+        Raise when the lookup was built for another vocabulary or with another layout, its topics would be wrong.
+        '''
+        if self.n_features != n_features or self.topics.shape[0] != self.n_keys(self.n_features, self.max_terms):
+            raise ValueError(
+                f'topic lookup of {self.n_features} features and {self.topics.shape[0]} keys does not match '
+                f'a model of {n_features} features, train the lda model again to rebuild it'
+            )
+
+    def lookup(self, X):
+        '''
+        Topic distribution of documents answered by the lookup.
+
+        Args
+        ----
+        X : sparse matrix of shape (n_docs, n_features)
+            Binary document-term matrix.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Topic distribution of each document (NaN for misses) and the mask of documents found.
+        '''
+        X = sp.csr_matrix(X)
+        X.sort_indices()
+        self.check(X.shape[1])
+
+        n_terms = np.diff(X.indptr)
+        starts = X.indptr[:-1]
+        keys = np.full(X.shape[0], -1, dtype=np.int64)
+
+        # just binary documents can be answered
+        single = (n_terms == 1) & (X.data[np.minimum(starts, X.nnz - 1)] == 1) if X.nnz > 0 else np.zeros(X.shape[0], dtype=bool)
+        keys[single] = X.indices[starts[single]]
+
+        if self.max_terms == 2 and X.nnz > 0:
+            pair = (n_terms == 2)
+            pair[pair] = (X.data[starts[pair]] == 1) & (X.data[starts[pair] + 1] == 1)
+
+            # indices are sorted, so first < second
+            first = X.indices[starts[pair]].astype(np.int64)
+            second = X.indices[starts[pair] + 1].astype(np.int64)
+            keys[pair] = self.n_features + self.pair_offset(first) + second - first - 1
+
+        topics = np.full((X.shape[0], self.topics.shape[1]), np.nan, dtype=self.topics.dtype)
+        found = keys >= 0
+        topics[found] = self.topics[keys[found]]
+
+        return topics, found
@@ -1,34 +1,171 @@
-from src.constants import LDA_MODEL_PATH, LDA_PREPROCESSOR_PATH
-from src.utils.common import load_object
+from src.entity.config_entity import PredictPipelineConfig
+from src.utils.common import load_object, hash_files
 from src.utils.exception import CustomException
+from src.utils import logger
+from src.pipeline.lda_inference import fast_lda_transform, compact_lda_model
 
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import scipy.sparse as sp
+
+# min reviews of each core, smaller inputs are not split
+MIN_CHUNK_SIZE = 1000
 
 class PredictPipeline:
+    '''
+    PredictPipeline
+    ---------------
+    Predict the complaint type of reviews: Product, Delivery or Inconclusive.
+
+    Attributes
+    ----------
+    fast_inference : bool
+        Use the approximate vectorized E-step instead of the model transform.
+
+    max_iter : int
+        Max E-step iterations of the fast inference.
+
+    tol : float
+        Mean change tolerance of the fast inference.
+
+    early_stop_margin : float
+        Fast inference stops updating a review once its topic margin is this much above the threshold.
+
+    n_jobs : int
+        Max cores used to infer topics of large inputs, -1 uses all of them.
+
+    config : PredictPipelineConfig
+        Paths of the model artifacts of a run, the ones of config/config.yaml by default.
+
+    precision : str ['float32', 'float64']
+        Precision of the model matrices and of the inference.
+
+    topic_lookup : TopicLookup
+        Precomputed topics of reviews with one or two terms, None if not available.
+    '''
+
+    def __init__(self, config: PredictPipelineConfig = None, fast_inference=False, max_iter=30, tol=1e-2, early_stop_margin=0.05, n_jobs=1, precision='float32'):
+        if config is None:
+            from src.config.configuration import ConfigurationManager
+            config = ConfigurationManager().get_predict_pipeline_config()
+
+        self.config = config
+        self.fast_inference = fast_inference
+        self.max_iter = max_iter
+        self.tol = tol
+        self.early_stop_margin = early_stop_margin
+        self.n_jobs = n_jobs
+        self.precision = precision
 
-    def __init__(self):
         self.__load_objects()
 
     def __load_objects(self):
-        self.__model = load_object(LDA_MODEL_PATH)
-        self.__preprocessor = load_object(LDA_PREPROCESSOR_PATH)
+        model_path = self.config.model_path
+        compact_model_path = self.config.compact_model_path
+        preprocessor_path = self.config.preprocessor_path
+        lookup_path = self.config.lookup_path
+
+        # float32 model exported by the trainer, models trained before it existed are cast on load
+        if self.precision == 'float32' and os.path.exists(compact_model_path):
+            model_path = compact_model_path
+
+        self.__model = compact_lda_model(load_object(model_path), np.dtype(self.precision))
+        self.__preprocessor = load_object(preprocessor_path)
         self.__topic_threshold = 0.15
 
+        # lookup is optional, models trained before it existed do not have one
+        self.topic_lookup = load_object(lookup_path) if os.path.exists(lookup_path) else None
+
+        if self.topic_lookup is not None:
+            self.topic_lookup.check(self.__model.components_.shape[1])
+
+        # identifies the model, preprocessor and lookup used, so stored predictions can be reused
+        self.model_version = hash_files([model_path, preprocessor_path] + ([lookup_path] if self.topic_lookup is not None else []))
+
+    def transform_topics(self, prepared_reviews):
+        '''
+        Topic distribution of the given vectorized reviews.
+        '''
+        if self.topic_lookup is None:
+            return self.__infer_topics(prepared_reviews)
+
+        # answer short reviews from the lookup, infer just the others
+        reviews_topics, found = self.topic_lookup.lookup(prepared_reviews)
+        # debug level, predictions run chunk by chunk
+        logger.debug(f'topic lookup answered {found.sum()} of {found.shape[0]} reviews (hit rate {found.mean():.4f}).')
+
+        if not found.all():
+            reviews_topics[~found] = self.__infer_topics(prepared_reviews[~found])
+
+        return reviews_topics
+
+    def __infer_topics(self, prepared_reviews):
+        from joblib import effective_n_jobs
+        from sklearn.utils import gen_even_slices
+
+        # counts in the precision of the model, sklearn would cast other dtypes to float64
+        prepared_reviews = sp.csr_matrix(prepared_reviews, dtype=self.__model.components_.dtype)
+
+        # split large inputs in even chunks, one per core
+        n_chunks = min(effective_n_jobs(self.n_jobs), max(prepared_reviews.shape[0] // MIN_CHUNK_SIZE, 1))
+
+        if self.fast_inference:
+            if n_chunks == 1:
+                return self.__fast_transform(prepared_reviews)
+
+            # reviews are independent, and numpy releases the gil in the matrix products
+            with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+                chunks_topics = executor.map(
+                    lambda chunk: self.__fast_transform(prepared_reviews[chunk]),
+                    gen_even_slices(prepared_reviews.shape[0], n_chunks)
+                )
+
+                return np.vstack(list(chunks_topics))
+
+        if n_chunks == 1:
+            return self.__model.transform(prepared_reviews)
+
+        # the model splits reviews across processes by itself, n_jobs is set on a shallow copy
+        # so calls from other threads keep their own
+        model = copy.copy(self.__model)
+        model.n_jobs = n_chunks
+
+        return model.transform(prepared_reviews)
+
+    def __fast_transform(self, prepared_reviews):
+        return fast_lda_transform(
+            self.__model,
+            prepared_reviews,
+            max_iter=self.max_iter,
+            tol=self.tol,
+            threshold=self.__topic_threshold,
+            early_stop_margin=self.early_stop_margin
+        )
+
+    def label_topics(self, prepared_reviews, reviews_topics):
+        '''
+        Complaint type of each review given its topic distribution.
+        '''
+        reviews_topics = np.asarray(reviews_topics)
+        is_empty = np.asarray(prepared_reviews.sum(axis=1)).ravel() == 0
+        is_inconclusive = is_empty | (np.abs(reviews_topics[:, 0] - reviews_topics[:, 1]) <= self.__topic_threshold)
+
+        out_topics = np.where(
+            is_inconclusive,
+            'Inconclusive',
+            np.where(reviews_topics[:, 0] > reviews_topics[:, 1], 'Product', 'Delivery')
+        )
+
+        return out_topics.tolist()
+
     def predict_review(self, reviews):
         try:
             prepared_reviews = self.__preprocessor.transform(reviews)
-            reviews_topics = self.__model.transform(prepared_reviews)
-
-            out_topics = []
-            for i, topic in enumerate(reviews_topics):
-                if prepared_reviews[i].sum() == 0 or np.abs(topic[0] - topic[1]) <= self.__topic_threshold:
-                    out_topics.append('Inconclusive')
-                elif topic[0] > topic[1]:
-                    out_topics.append('Product')
-                else:
-                    out_topics.append('Delivery')
+            reviews_topics = self.transform_topics(prepared_reviews)
 
-            return out_topics
+            return self.label_topics(prepared_reviews, reviews_topics)
 
         except Exception as e:
-            raise CustomException(e)
\ No newline at end of file
+            raise CustomException(e)
@@ -0,0 +1,87 @@
+from typing import List
+
+from src.config.configuration import ConfigurationManager
+
+# components are imported by their stages, so running a single stage does not load every dependency
+
+def run_data_ingestion(config_manager: ConfigurationManager):
+    from src.components.data_ingestion import DataIngestion
+
+    data_ingestion_config = config_manager.get_data_ingestion_config()
+    data_ingestion = DataIngestion(data_ingestion_config)
+    data_ingestion.initiate_data_ingestion()
+
+def run_geo_features(config_manager: ConfigurationManager):
+    from src.components.geo_features import GeoFeatures
+
+    geo_features_config = config_manager.get_geo_features_config()
+    geo_features = GeoFeatures(geo_features_config)
+    geo_features.initiate_geo_features()
+
+def run_lda_data_ingestion(config_manager: ConfigurationManager):
+    from src.components.lda.data_ingestion import LDADataIngestion
+
+    lda_data_ingestion_config = config_manager.get_lda_data_ingestion_config()
+    lda_data_ingestion = LDADataIngestion(lda_data_ingestion_config)
+    lda_data_ingestion.initiate_data_ingestion()
+
+def run_lda_data_transformation(config_manager: ConfigurationManager):
+    from src.components.lda.data_transformation import LDADataTranformation
+
+    lda_data_transformation_config = config_manager.get_lda_data_transformation_config()
+    lda_data_transformation = LDADataTranformation(lda_data_transformation_config)
+    lda_data_transformation.initiate_data_transformation()
+
+def run_lda_model_trainer(config_manager: ConfigurationManager):
+    from src.components.lda.model_trainer import LDAModelTrainer
+
+    lda_model_trainer_config = config_manager.get_lda_model_trainer_config()
+    lda_model_trainer = LDAModelTrainer(lda_model_trainer_config)
+    lda_model_trainer.initiate_model_trainer()
+
+def run_data_preprocessing(config_manager: ConfigurationManager):
+    from src.components.data_preprocessing import DataPreprocessing
+
+    data_preprocessing_config = config_manager.get_data_preprocessing_config()
+    data_preprocessing = DataPreprocessing(data_preprocessing_config)
+    data_preprocessing.initiate_data_preprocessing()
+
+def run_dashboard_database(config_manager: ConfigurationManager):
+    from src.components.dashboard_database import DashboardDatabase
+
+    dashboard_database_config = config_manager.get_dashboard_database_config()
+    dashboard_database = DashboardDatabase(dashboard_database_config)
+    dashboard_database.initiate_dashboard_database()
+
+# pipeline stages, in running order
+STAGES = {
+    'data_ingestion': run_data_ingestion,
+    'geo_features': run_geo_features,
+    'lda_data_ingestion': run_lda_data_ingestion,
+    'lda_data_transformation': run_lda_data_transformation,
+    'lda_model_trainer': run_lda_model_trainer,
+    'data_preprocessing': run_data_preprocessing,
+    'dashboard_database': run_dashboard_database
+}
+
+def run_stages(config_manager: ConfigurationManager, stages: List[str] = None):
+    '''
+    Run the given pipeline stages in running order, all of them by default.
+
+    Args
+    ----
+    config_manager : ConfigurationManager
+        Configuration of the run.
+
+    stages : List[str]
+        Names of the stages to run.
+    '''
+    stages = stages or list(STAGES)
+
+    unknown_stages = [stage for stage in stages if stage not in STAGES]
+    if unknown_stages:
+        raise ValueError(f'unknown stages {unknown_stages}, available stages are {list(STAGES)}')
+
+    for stage in STAGES:
+        if stage in stages:
+            STAGES[stage](config_manager)
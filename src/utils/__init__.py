@@ -6,20 +6,43 @@ from datetime import datetime
 LOG_FORMAT = '[ %(asctime)s ] %(lineno)d %(filename)s - %(levelname)s - %(message)s'
 
 LOG_DIR = 'logs'
-LOG_FILE = f'{datetime.now().strftime("%m_%d_%Y_%H_%M_%S")}.log'
-LOG_FILEPATH = os.path.join(LOG_DIR, LOG_FILE)
 
-os.makedirs(LOG_DIR, exist_ok=True)
+logger = logging.getLogger()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=LOG_FORMAT,
-    datefmt='%m-%d-%Y %I:%M:%S %p',
+# path of the log file created by setup_logging, None until it is called
+log_filepath = None
 
-    handlers=[
-        logging.FileHandler(LOG_FILEPATH),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+def setup_logging(log_dir: str = LOG_DIR) -> str:
+    '''
+    Log to stdout and to a new timestamped file at log_dir. Called once by the entry points,
+    importing src does not create log files.
 
-logger = logging.getLogger()
\ No newline at end of file
+    Args
+    ----
+    log_dir : str
+        Directory of log files.
+
+    Returns
+    -------
+    str
+        Path of the log file.
+    '''
+    global log_filepath
+
+    if log_filepath is None:
+        os.makedirs(log_dir, exist_ok=True)
+        # the pid keeps apart the files of runs started in the same second
+        log_filepath = os.path.join(log_dir, f'{datetime.now().strftime("%m_%d_%Y_%H_%M_%S")}_{os.getpid()}.log')
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format=LOG_FORMAT,
+            datefmt='%m-%d-%Y %I:%M:%S %p',
+
+            handlers=[
+                logging.FileHandler(log_filepath),
+                logging.StreamHandler(sys.stdout)
+            ]
+        )
+
+    return log_filepath
@@ -1,14 +1,21 @@
 import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, TYPE_CHECKING
 import pickle
 import bz2
+import hashlib
 
 import yaml
 from box import ConfigBox
 
 from src.utils import logger
 from src.utils.exception import CustomException
+from src.constants import ARTIFACTS_ROOT
+
+# pandas is imported by the functions that need it, so reading the configuration stays fast
+if TYPE_CHECKING:
+    import pandas as pd
 
 def read_yaml(path_to_yaml: Path) -> ConfigBox:
     '''
@@ -55,6 +62,33 @@ def create_directories(path_to_directories: List[Path], verbose=True):
     except Exception as e:
         raise CustomException(e)
     
+@contextmanager
+def atomic_write(file_path: Path) -> Iterator[Path]:
+    '''
+    Yield a temporary path next to file_path, moved to file_path once the block succeeds.
+    Readers never see a partial file and a failed write keeps the previous file.
+
+    Args
+    ----
+    file_path : Path
+        Path of the file to write.
+
+    Returns
+    -------
+    Iterator[Path]
+        The temporary path to write to.
+    '''
+    file_path = Path(file_path)
+    tmp_path = file_path.with_name(f'.{file_path.name}.{os.getpid()}.tmp')
+
+    try:
+        yield tmp_path
+        os.replace(tmp_path, file_path)
+
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
 def save_obj(file_path: Path, obj: any):
     '''
     Serialize the given object and save at the given path.
@@ -71,7 +105,7 @@ def save_obj(file_path: Path, obj: any):
         dir_path = os.path.dirname(file_path)
         create_directories([dir_path])
 
-        with bz2.BZ2File(file_path, 'wb') as file:
+        with atomic_write(file_path) as tmp_path, bz2.BZ2File(tmp_path, 'wb') as file:
             pickle.dump(obj, file)
 
     except Exception as e:
@@ -96,4 +130,123 @@ def load_object(file_path: Path) -> any:
             return pickle.load(file)
     
     except Exception as e:
-        raise CustomException(f'failed loading object from {file_path}: {e}')
\ No newline at end of file
+        raise CustomException(f'failed loading object from {file_path}: {e}')
+    
+def hash_text(text: str) -> int:
+    '''
+    Stable 64 bits hash of the given text.
+
+    Args
+    ----
+    text : str
+        Text to hash.
+
+    Returns
+    -------
+    int
+        The text hash as an unsigned 64 bits integer.
+    '''
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def hash_files(file_paths: List[Path]) -> str:
+    '''
+    Hash the content of the given files, used to identify versions of artifacts.
+
+    Args
+    ----
+    file_paths : List[Path]
+        Paths to files to hash.
+
+    Returns
+    -------
+    str
+        Hex digest of the files content.
+    '''
+    try:
+        file_hash = hashlib.blake2b(digest_size=16)
+
+        for file_path in file_paths:
+            with open(file_path, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b''):
+                    file_hash.update(block)
+
+        return file_hash.hexdigest()
+
+    except Exception as e:
+        raise CustomException(f'failed hashing files {file_paths}: {e}')
+
+def list_csv_files(path: Path) -> List[Path]:
+    '''
+    List the csv files of a partitioned dataset, or the path itself when it is a single file.
+
+    Args
+    ----
+    path : Path
+        Path to a csv file or to a directory of csv partitions.
+
+    Returns
+    -------
+    List[Path]
+        Sorted paths to the csv files.
+    '''
+    path = Path(path)
+
+    if path.is_dir():
+        return sorted(path.rglob('*.csv'))
+
+    return [path]
+
+def rebase_artifact_path(path: Path, artifacts_root: Path) -> Path:
+    '''
+    Path of a default artifact under another artifacts root.
+
+    Args
+    ----
+    path : Path
+        Artifact path under the default ARTIFACTS_ROOT.
+
+    artifacts_root : Path
+        Artifacts root to move the path to.
+
+    Returns
+    -------
+    Path
+        The artifact path under artifacts_root.
+    '''
+    return Path(artifacts_root) / Path(path).relative_to(ARTIFACTS_ROOT)
+
+def to_month_period(dates: 'pd.Series') -> 'pd.Series':
+    '''
+    Integer month period of the given dates, computed as year * 12 + month - 1.
+
+    Args
+    ----
+    dates : pd.Series
+        Datetime series.
+
+    Returns
+    -------
+    pd.Series
+        The month periods.
+    '''
+    return dates.dt.year * 12 + dates.dt.month - 1
+
+def month_period_to_date(periods) -> 'pd.Series':
+    '''
+    First day of the month of each given integer month period.
+
+    Args
+    ----
+    periods : array-like
+        Month periods computed with to_month_period.
+
+    Returns
+    -------
+    pd.Series
+        Dates of the periods.
+    '''
+    import numpy as np
+    import pandas as pd
+
+    periods = np.asarray(periods, dtype=np.int64)
+    return pd.to_datetime(pd.DataFrame({ 'year' : periods // 12, 'month' : periods % 12 + 1, 'day' : 1 }))
@@ -0,0 +1,47 @@
+import ast
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from src.utils.common import load_object
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# trained model and held-out reviews tracked in the repository
+LDA_MODEL_PATH = ROOT_DIR / 'artifacts/lda/lda_model.pkl'
+TEST_REVIEWS_PATH = ROOT_DIR / 'artifacts/lda/data_tranformation/reviews_test.csv'
+
+@pytest.fixture(scope='session')
+def lda_model():
+    return load_object(LDA_MODEL_PATH)
+
+@pytest.fixture(scope='session')
+def test_vectors():
+    vectors = pd.read_csv(TEST_REVIEWS_PATH)['vectors']
+    return sp.csr_matrix(np.array([ast.literal_eval(vector) for vector in vectors]))
+
+@pytest.fixture
+def stub_predict_pipeline(monkeypatch):
+    '''
+    PredictPipeline labelling reviews by keywords, without the model. Scored reviews are kept in scored.
+    '''
+    class StubPredictPipeline:
+        model_version = 'stub-1'
+        scored = []
+
+        def __init__(self, config=None, **kwargs):
+            pass
+
+        def predict_review(self, reviews):
+            reviews = list(reviews)
+            StubPredictPipeline.scored.extend(reviews)
+
+            return ['Product' if 'produto' in review else 'Delivery' if 'entrega' in review else 'Inconclusive' for review in reviews]
+
+    import src.pipeline.predict_pipeline
+    monkeypatch.setattr(src.pipeline.predict_pipeline, 'PredictPipeline', StubPredictPipeline)
+
+    return StubPredictPipeline
@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REVIEW_TEXTS = [
+    ('Produto', 'produto veio quebrado'),
+    ('Entrega', 'entrega atrasada'),
+    ('Ruim', 'não gostei'),
+    (None, 'produto errado'),
+    ('Atraso', None)
+]
+
+def build_olist_export(n_orders: int = 120, seed: int = 0) -> dict:
+    '''
+    Small synthetic olist export, tables named like DataIngestion.load_datasets names them.
+    '''
+    rng = np.random.default_rng(seed)
+    order_ids = [f'o{i}' for i in range(n_orders)]
+
+    purchase = pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.integers(0, 120 * 24, n_orders), unit='h')
+    estimated = purchase + pd.to_timedelta(rng.integers(5, 20, n_orders), unit='D')
+    delivered = pd.Series(estimated + pd.to_timedelta(rng.integers(-72, 72, n_orders), unit='h')).where(rng.random(n_orders) > 0.1)
+    date_format = '%Y-%m-%d %H:%M:%S'
+
+    orders = pd.DataFrame({
+        'order_id': order_ids,
+        'customer_id': [f'c{i}' for i in range(n_orders)],
+        'order_status': rng.choice(['delivered', 'shipped', 'canceled'], n_orders, p=[0.8, 0.1, 0.1]),
+        'order_purchase_timestamp': purchase.strftime(date_format),
+        'order_approved_at': purchase.strftime(date_format),
+        'order_delivered_carrier_date': purchase.strftime(date_format),
+        'order_delivered_customer_date': delivered.dt.strftime(date_format),
+        'order_estimated_delivery_date': estimated.strftime(date_format)
+    })
+
+    # some orders have two reviews, reviews repeat texts
+    review_orders = order_ids + list(rng.choice(order_ids, n_orders // 4, replace=False))
+    texts = [REVIEW_TEXTS[i] for i in rng.integers(0, len(REVIEW_TEXTS), len(review_orders))]
+    order_reviews = pd.DataFrame({
+        'review_id': [f'r{i}' for i in range(len(review_orders))],
+        'order_id': review_orders,
+        'review_score': rng.integers(1, 6, len(review_orders)),
+        'review_comment_title': [title for title, _ in texts],
+        'review_comment_message': [message for _, message in texts],
+        'review_creation_date': '2017-06-01 00:00:00',
+        'review_answer_timestamp': '2017-06-02 00:00:00'
+    })
+
+    order_items = pd.DataFrame({
+        'order_id': order_ids,
+        'order_item_id': 1,
+        'product_id': rng.choice([f'p{i}' for i in range(10)], n_orders),
+        'seller_id': rng.choice([f's{i}' for i in range(5)], n_orders),
+        'shipping_limit_date': '2017-01-01 00:00:00',
+        'price': 10.0,
+        'freight_value': 1.0
+    })
+
+    order_payments = pd.DataFrame({
+        'order_id': order_ids,
+        'payment_sequential': 1,
+        'payment_type': 'credit_card',
+        'payment_installments': 1,
+        'payment_value': 11.0
+    })
+
+    products = pd.DataFrame({
+        'product_id': [f'p{i}' for i in range(10)],
+        'product_category_name': 'artes',
+        'product_name_lenght': 40,
+        'product_description_lenght': 200,
+        'product_photos_qty': 1,
+        'product_weight_g': 100,
+        'product_length_cm': 10,
+        'product_height_cm': 10,
+        'product_width_cm': 10
+    })
+
+    sellers = pd.DataFrame({
+        'seller_id': [f's{i}' for i in range(5)],
+        'seller_zip_code_prefix': [1000 + i for i in range(5)],
+        'seller_city': 'sao paulo',
+        'seller_state': 'SP'
+    })
+
+    customers = pd.DataFrame({
+        'customer_id': [f'c{i}' for i in range(n_orders)],
+        'customer_unique_id': [f'u{i}' for i in range(n_orders)],
+        'customer_zip_code_prefix': rng.integers(1000, 1010, n_orders),
+        'customer_city': 'rio de janeiro',
+        'customer_state': 'RJ'
+    })
+
+    geolocation = pd.DataFrame({
+        'geolocation_zip_code_prefix': np.arange(1000, 1010),
+        'geolocation_lat': rng.uniform(-30, -5, 10),
+        'geolocation_lng': rng.uniform(-60, -35, 10),
+        'geolocation_city': 'x',
+        'geolocation_state': 'SP'
+    })
+
+    return {
+        'orders': orders, 'order_reviews': order_reviews, 'order_items': order_items, 'order_payments': order_payments,
+        'products': products, 'sellers': sellers, 'customers': customers, 'geolocation': geolocation
+    }
+
+def write_olist_export(datasets: dict, source_dir: Path, order_ids=None):
+    '''
+    Write the export as olist csv files, just the given orders and their reviews, items and payments.
+    '''
+    source_dir.mkdir(parents=True, exist_ok=True)
+
+    for name, dataset in datasets.items():
+        if order_ids is not None and 'order_id' in dataset.columns:
+            dataset = dataset[dataset.order_id.isin(order_ids)]
+
+        dataset.to_csv(source_dir / f'olist_{name}_dataset.csv', index=False)
@@ -0,0 +1,96 @@
+import json
+import time
+
+import pytest
+
+from src.pipeline.artifact_manifest import ArtifactReloader, read_manifest, versioned_write
+
+def write_version(manifest_path, file_path, content):
+    with versioned_write(manifest_path, file_path) as tmp_path:
+        # written under a temporary name next to the artifact
+        assert tmp_path.parent == file_path.parent
+        assert not tmp_path.name.startswith(file_path.stem + '-')
+        tmp_path.write_text(content)
+
+    return read_manifest(manifest_path)
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.01)
+
+def test_three_writes_keep_the_two_newest_versions(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    file_path = tmp_path / 'dashboard.db'
+
+    versions = [write_version(manifest_path, file_path, content) for content in ['first', 'second', 'third']]
+
+    # files are named by their content hash, the manifest points to the newest one
+    assert len({version for version, _ in versions}) == 3
+    for version, path in versions:
+        assert path.name == f'dashboard-{version}.db'
+
+    version, path = read_manifest(manifest_path)
+    assert path.read_text() == 'third'
+    assert sorted(tmp_path.iterdir()) == sorted([manifest_path, versions[1][1], versions[2][1]])
+    assert versions[1][1].read_text() == 'second'
+
+def test_rewriting_a_version_keeps_the_previous_one(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    file_path = tmp_path / 'dashboard.db'
+
+    first = write_version(manifest_path, file_path, 'first')
+    second = write_version(manifest_path, file_path, 'second')
+
+    # same content, same file, the second version is still the previous one
+    assert write_version(manifest_path, file_path, 'first') == first
+    assert sorted(tmp_path.iterdir()) == sorted([manifest_path, first[1], second[1]])
+
+def test_failed_write_keeps_the_manifest(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    file_path = tmp_path / 'dashboard.db'
+    write_version(manifest_path, file_path, 'first')
+    manifest = manifest_path.read_text()
+
+    with pytest.raises(RuntimeError):
+        with versioned_write(manifest_path, file_path) as tmp_path_:
+            tmp_path_.write_text('partial')
+            raise RuntimeError('interrupted')
+
+    assert manifest_path.read_text() == manifest
+    assert len(list(tmp_path.iterdir())) == 2
+
+def test_read_manifest_without_a_valid_manifest(tmp_path):
+    assert read_manifest(tmp_path / 'manifest.json') is None
+
+    (tmp_path / 'manifest.json').write_text(json.dumps({ 'version': 'a' }))
+    assert read_manifest(tmp_path / 'manifest.json') is None
+
+def test_reloader_swaps_once_per_new_version(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    file_path = tmp_path / 'dashboard.db'
+
+    swapped = []
+    reloader = ArtifactReloader(lambda path: path.read_text(), lambda: read_manifest(manifest_path), on_swap=swapped.append)
+
+    first_version, _ = write_version(manifest_path, file_path, 'first')
+    # the first load blocks and is not a swap
+    assert reloader.get() == (first_version, 'first')
+    assert reloader.get() == (first_version, 'first')
+
+    new_versions = []
+    for content in ['second', 'third']:
+        version, _ = write_version(manifest_path, file_path, content)
+        new_versions.append(version)
+
+        # the current version is served while the new one loads
+        assert reloader.get()[1] in ('first', 'second', 'third')
+        wait_for(lambda: reloader.get() == (version, content))
+
+        # gets of a loaded version do not swap again
+        for _ in range(3):
+            reloader.get()
+
+    assert swapped == new_versions
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from src.pipeline import batch_predict
+
+class EchoPipeline:
+    # stands for PredictPipeline, the complaint tells which text was scored
+    def predict_review(self, reviews):
+        return [f'scored {review}' for review in reviews]
+
+def init_echo_worker(*args):
+    batch_predict._worker_pipeline = EchoPipeline()
+
+@pytest.fixture(autouse=True)
+def echo_pipeline(monkeypatch):
+    monkeypatch.setattr(batch_predict, '_init_worker', init_echo_worker)
+
+@pytest.fixture
+def reviews():
+    return pd.DataFrame({
+        'review_id': ['a', 'b', 'c', 'd', 'e'],
+        'reviews': ['produto quebrado', None, '10', ' ', 'entrega atrasada'],
+        'score': [1, 2, 3, 4, 5]
+    })
+
+@pytest.mark.parametrize('suffix', ['.csv', '.jsonl', '.parquet'])
+@pytest.mark.parametrize('workers', [1, 2])
+def test_scores_in_input_order_with_id_column(tmp_path, reviews, suffix, workers):
+    input_path = tmp_path / f'reviews{suffix}'
+    if suffix == '.csv':
+        reviews.to_csv(input_path, index=False)
+    elif suffix == '.jsonl':
+        reviews.to_json(input_path, orient='records', lines=True)
+    else:
+        reviews.to_parquet(input_path)
+
+    batch_predict.score_reviews(input_path, tmp_path / 'out.csv', 'reviews', workers=workers, chunk_size=2, keep_columns=['review_id'])
+    results = pd.read_csv(tmp_path / 'out.csv', dtype=str, keep_default_na=False)
+
+    assert results.columns.tolist() == ['review_id', 'reviews', 'complaint']
+    assert results.review_id.tolist() == ['a', 'b', 'c', 'd', 'e']
+    # null and blank reviews have no complaint, numbers are scored as written
+    assert results.complaint.tolist() == ['scored produto quebrado', '', 'scored 10', '', 'scored entrega atrasada']
+
+def test_keeps_all_columns_and_reads_reviews_as_text(tmp_path):
+    input_path = tmp_path / 'reviews.csv'
+    pd.DataFrame({ 'id': [1, 2, 3], 'reviews': [1, None, 2] }).to_csv(input_path, index=False)
+
+    batch_predict.score_reviews(input_path, tmp_path / 'out.jsonl', 'reviews', keep_columns=[])
+    results = pd.read_json(tmp_path / 'out.jsonl', lines=True)
+
+    assert results.columns.tolist() == ['id', 'reviews', 'complaint']
+    # the csv has 1.0 since the column has nulls, it is scored as written
+    assert results.complaint.fillna('').tolist() == ['scored 1.0', '', 'scored 2.0']
+
+def test_empty_input_writes_header(tmp_path):
+    input_path = tmp_path / 'reviews.csv'
+    pd.DataFrame(columns=['review_id', 'reviews']).to_csv(input_path, index=False)
+
+    batch_predict.score_reviews(input_path, tmp_path / 'out.csv', 'reviews', keep_columns=['review_id'])
+
+    assert (tmp_path / 'out.csv').read_text().strip() == 'review_id,reviews,complaint'
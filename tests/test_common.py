@@ -0,0 +1,56 @@
+import pytest
+
+from src.utils.common import atomic_write, load_object, save_obj
+from src.utils.exception import CustomException
+
+def test_atomic_write_replaces_file_on_success(tmp_path):
+    file_path = tmp_path / 'data.csv'
+    file_path.write_text('old')
+
+    with atomic_write(file_path) as tmp:
+        assert tmp.parent == tmp_path
+        tmp.write_text('new')
+
+        # readers see the previous file until the block ends
+        assert file_path.read_text() == 'old'
+
+    assert file_path.read_text() == 'new'
+    assert list(tmp_path.iterdir()) == [file_path]
+
+def test_atomic_write_keeps_previous_file_on_failure(tmp_path):
+    file_path = tmp_path / 'data.csv'
+    file_path.write_text('old')
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(file_path) as tmp:
+            tmp.write_text('partial')
+            raise RuntimeError('interrupted')
+
+    assert file_path.read_text() == 'old'
+    assert list(tmp_path.iterdir()) == [file_path]
+
+def test_atomic_write_without_previous_file(tmp_path):
+    file_path = tmp_path / 'model.pkl'
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(file_path) as tmp:
+            tmp.write_bytes(b'partial')
+            raise RuntimeError('interrupted')
+
+    assert not file_path.exists()
+    assert list(tmp_path.iterdir()) == []
+
+def test_save_obj_round_trip(tmp_path):
+    save_obj(tmp_path / 'obj.pkl', {'topics': [0.1, 0.9]})
+
+    assert load_object(tmp_path / 'obj.pkl') == {'topics': [0.1, 0.9]}
+    assert [path.name for path in tmp_path.iterdir()] == ['obj.pkl']
+
+def test_save_obj_failure_keeps_previous_object(tmp_path):
+    save_obj(tmp_path / 'obj.pkl', 'previous')
+
+    with pytest.raises(CustomException):
+        save_obj(tmp_path / 'obj.pkl', lambda: 'not picklable')
+
+    assert load_object(tmp_path / 'obj.pkl') == 'previous'
+    assert [path.name for path in tmp_path.iterdir()] == ['obj.pkl']
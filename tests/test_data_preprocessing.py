@@ -0,0 +1,55 @@
+import pandas as pd
+
+from src.components.data_preprocessing import DataPreprocessing
+from src.entity.config_entity import DataPreprocessingConfig, PredictPipelineConfig
+
+def make_preprocessing(tmp_path):
+    return DataPreprocessing(DataPreprocessingConfig(
+        dest_dir=str(tmp_path),
+        dest_filename='data.csv',
+        source_data_path=tmp_path / 'data_ingestion.csv',
+        labels_store_path=tmp_path / 'labels_store.pkl',
+        partitions_dir=tmp_path / 'partitions',
+        source_layout='flat',
+        source_star_dir=tmp_path / 'star',
+        incremental=False,
+        source_partitions_dir=tmp_path / 'ingestion_partitions',
+        predict_pipeline=PredictPipelineConfig(model_path=None, compact_model_path=None, preprocessor_path=None, lookup_path=None),
+        n_jobs=1
+    ))
+
+REVIEWS = pd.Series(
+    ['produto quebrado', 'entrega atrasada', 'produto quebrado', 'não gostei', 'entrega atrasada', 'produto quebrado'],
+    index=[10, 3, 7, 1, 20, 5]
+)
+
+def test_duplicated_reviews_are_scored_once_in_input_order(tmp_path, stub_predict_pipeline):
+    complaints = make_preprocessing(tmp_path).predict_complaints(REVIEWS)
+
+    assert sorted(stub_predict_pipeline.scored) == ['entrega atrasada', 'não gostei', 'produto quebrado']
+    assert complaints.index.tolist() == REVIEWS.index.tolist()
+    assert complaints.tolist() == ['Product', 'Delivery', 'Product', 'Inconclusive', 'Delivery', 'Product']
+
+def test_stored_labels_are_reused_by_the_same_model(tmp_path, stub_predict_pipeline):
+    preprocessing = make_preprocessing(tmp_path)
+    preprocessing.predict_complaints(REVIEWS)
+
+    stub_predict_pipeline.scored.clear()
+    complaints = preprocessing.predict_complaints(pd.Series(['entrega atrasada', 'produto novo']))
+
+    assert stub_predict_pipeline.scored == ['produto novo']
+    assert complaints.tolist() == ['Delivery', 'Product']
+
+def test_new_model_version_invalidates_stored_labels(tmp_path, stub_predict_pipeline, monkeypatch):
+    preprocessing = make_preprocessing(tmp_path)
+    preprocessing.predict_complaints(REVIEWS)
+
+    # another model labels every review as inconclusive
+    monkeypatch.setattr(stub_predict_pipeline, 'model_version', 'stub-2')
+    monkeypatch.setattr(stub_predict_pipeline, 'predict_review', lambda self, reviews: ['Inconclusive'] * len(reviews))
+
+    complaints = preprocessing.predict_complaints(REVIEWS)
+
+    assert complaints.tolist() == ['Inconclusive'] * len(REVIEWS)
+    assert preprocessing.load_labels_store('stub-1') == {}
+    assert len(preprocessing.load_labels_store('stub-2')) == 3
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.constants import ALL_PERIODS
+from src.pipeline.dashboard_metrics import compute_period_metrics
+from src.pipeline.delivery_metrics import add_delivery_columns, compute_delivery_lateness, summarize_deliveries
+from src.utils.common import to_month_period
+
+@pytest.fixture
+def prepared_data():
+    rng = np.random.default_rng(0)
+    n_orders = 200
+
+    purchase = pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, n_orders), unit='s')
+    estimated = purchase + pd.to_timedelta(rng.integers(5 * 24 * 3600, 30 * 24 * 3600, n_orders), unit='s')
+    delivered = estimated + pd.to_timedelta(rng.integers(-10 * 24 * 3600, 10 * 24 * 3600, n_orders), unit='s')
+
+    orders = pd.DataFrame({
+        'order_id': [f'order_{i}' for i in range(n_orders)],
+        'order_status': rng.choice(['delivered', 'shipped', 'canceled'], n_orders, p=[0.8, 0.1, 0.1]),
+        'order_purchase_timestamp': purchase,
+        'order_delivered_customer_date': delivered.where(rng.random(n_orders) > 0.1),
+        'order_estimated_delivery_date': estimated
+    })
+
+    # some orders have many reviews, some reviews have no score
+    data = orders.loc[rng.integers(0, n_orders, 300)].reset_index(drop=True)
+    data['review_score'] = pd.Series(rng.integers(1, 6, data.shape[0]), dtype=float).where(rng.random(data.shape[0]) > 0.1)
+    data['complaint'] = rng.choice(['Product', 'Delivery', 'Inconclusive'], data.shape[0])
+    data['purchase_period'] = to_month_period(data.order_purchase_timestamp)
+
+    return data
+
+def naive_lateness(orders):
+    # late when delivered in a day after the estimated day, whole days between the dates
+    is_late = orders.order_delivered_customer_date.dt.normalize() > orders.order_estimated_delivery_date.dt.normalize()
+    late_days = (orders.order_delivered_customer_date - orders.order_estimated_delivery_date).dt.days
+
+    return is_late.to_numpy(), np.where(is_late, late_days, 0)
+
+def test_lateness_matches_timedelta_days(prepared_data):
+    is_late, late_days = compute_delivery_lateness(prepared_data.order_delivered_customer_date, prepared_data.order_estimated_delivery_date)
+    expected_is_late, expected_late_days = naive_lateness(prepared_data)
+
+    np.testing.assert_array_equal(is_late, expected_is_late)
+    np.testing.assert_array_equal(late_days, expected_late_days)
+    assert late_days.dtype == np.int16
+
+def test_summarize_deliveries_with_and_without_delivery_columns(prepared_data):
+    orders = prepared_data.drop_duplicates(subset=['order_id'])
+    summary = summarize_deliveries(orders, by='purchase_period')
+
+    is_late, late_days = naive_lateness(orders)
+    expected = pd.DataFrame({
+        'purchase_period': orders.purchase_period,
+        'orders_delivered': orders.order_status == 'delivered',
+        'orders_late': is_late,
+        'late_days_sum': late_days
+    }).groupby('purchase_period').sum()
+
+    np.testing.assert_array_equal(summary.index, expected.index)
+    for column in expected.columns:
+        np.testing.assert_array_equal(summary[column], expected[column])
+
+    orders = orders.copy()
+    add_delivery_columns(orders)
+    pd.testing.assert_frame_equal(summarize_deliveries(orders, by='purchase_period'), summary)
+
+def test_period_metrics_match_naive_metrics(prepared_data):
+    metrics = compute_period_metrics(prepared_data)
+
+    periods = sorted(prepared_data.purchase_period.unique())
+    assert metrics.index.tolist() == [ALL_PERIODS] + periods
+
+    for period in [ALL_PERIODS] + periods:
+        rows = prepared_data if period == ALL_PERIODS else prepared_data[prepared_data.purchase_period == period]
+        orders = rows.drop_duplicates(subset=['order_id'])
+        is_late, late_days = naive_lateness(orders)
+
+        row = metrics.loc[period]
+        assert row.orders_count == rows.shape[0]
+        assert row.orders_delivered == (orders.order_status == 'delivered').sum()
+        assert row.orders_pendent == rows.shape[0] - (orders.order_status == 'delivered').sum()
+        assert row.orders_late == is_late.sum()
+        assert row.orders_avarage_late_delivery_time == (late_days.sum() // is_late.sum() if is_late.any() else 0)
+        assert row.scores_mean == pytest.approx(rows.review_score.mean())
+        assert row.product_complaints == (rows.complaint == 'Product').sum()
+        assert row.delivery_complaints == (rows.complaint == 'Delivery').sum()
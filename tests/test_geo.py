@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.geo import EARTH_RADIUS_KM, SellerIndex, haversine_km
+
+def scalar_haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+@pytest.fixture
+def sellers():
+    rng = np.random.default_rng(0)
+    n_sellers = 300
+
+    # sellers share the centroid of their zip prefix
+    centroids = np.column_stack([rng.uniform(-33, 5, 60), rng.uniform(-73, -35, 60)])
+    codes = rng.integers(0, centroids.shape[0], n_sellers)
+
+    sellers = pd.DataFrame({
+        'seller_id': [f'seller_{i}' for i in range(n_sellers)],
+        'mean_lat_seller': centroids[codes, 0],
+        'mean_lon_seller': centroids[codes, 1]
+    })
+    sellers.loc[:4, 'mean_lat_seller'] = np.nan
+
+    return sellers
+
+def test_haversine_matches_scalar_formula():
+    rng = np.random.default_rng(1)
+    lat1, lat2 = rng.uniform(-90, 90, (2, 500))
+    lon1, lon2 = rng.uniform(-180, 180, (2, 500))
+
+    expected = [scalar_haversine_km(*point) for point in zip(lat1, lon1, lat2, lon2)]
+
+    np.testing.assert_allclose(haversine_km(lat1, lon1, lat2, lon2), expected, rtol=1e-12)
+    np.testing.assert_allclose(haversine_km(lat1, lon1, lat2, lon2), haversine_km(lat2, lon2, lat1, lon1))
+
+def test_haversine_known_distance_and_missing_coordinates():
+    # São Paulo to Rio de Janeiro
+    assert haversine_km(-23.5505, -46.6333, -22.9068, -43.1729) == pytest.approx(360.7, abs=1)
+
+    distances = haversine_km([0, np.nan], [0, 0], [0, 0], [1, 1])
+    assert distances[0] == pytest.approx(2 * math.pi * EARTH_RADIUS_KM / 360)
+    assert np.isnan(distances[1])
+
+def test_query_radius_matches_brute_force(sellers):
+    index = SellerIndex.build(sellers)
+    located = sellers.dropna()
+
+    rng = np.random.default_rng(2)
+    lat, lon = rng.uniform(-33, 5, 50), rng.uniform(-73, -35, 50)
+
+    for point_lat, point_lon, found in zip(lat, lon, index.query_radius(lat, lon, radius_km=500)):
+        distances = haversine_km(point_lat, point_lon, located.mean_lat_seller, located.mean_lon_seller)
+        assert set(found) == set(located.seller_id[distances <= 500])
+
+def test_query_nearest_matches_brute_force(sellers):
+    index = SellerIndex.build(sellers)
+    located = sellers.dropna()
+
+    rng = np.random.default_rng(3)
+    lat, lon = rng.uniform(-33, 5, 50), rng.uniform(-73, -35, 50)
+    distances, centroids = index.query_nearest(lat, lon, k=1)
+
+    for i in range(lat.shape[0]):
+        seller_distances = haversine_km(lat[i], lon[i], located.mean_lat_seller, located.mean_lon_seller)
+        nearest = set(located.seller_id[np.isclose(seller_distances, seller_distances.min())])
+
+        assert distances[i, 0] == pytest.approx(seller_distances.min())
+        assert set(index.sellers_at(centroids[i])[0]) == nearest
@@ -0,0 +1,90 @@
+import pandas as pd
+
+from olist_export import build_olist_export, write_olist_export
+from src.components.data_ingestion import DataIngestion
+from src.components.data_preprocessing import DataPreprocessing, PREPARED_COLUMNS
+from src.entity.config_entity import DataIngestionConfig, DataPreprocessingConfig, PredictPipelineConfig
+
+def run_pipeline(root, source_dir, incremental):
+    DataIngestion(DataIngestionConfig(
+        source_dir=source_dir,
+        dest_dir=str(root / 'data_ingestion'),
+        dest_filename='data.csv',
+        layout='flat',
+        star_dir=root / 'data_ingestion/star',
+        incremental=incremental,
+        partitions_dir=root / 'data_ingestion/partitions',
+        state_filename='ingestion_state.pkl',
+        sample_fraction=None,
+        sample_max_orders=None,
+        sample_seed=42
+    )).initiate_data_ingestion()
+
+    DataPreprocessing(DataPreprocessingConfig(
+        dest_dir=str(root / 'data_preprocessing'),
+        dest_filename='data.csv',
+        source_data_path=root / 'data_ingestion/data.csv',
+        labels_store_path=root / 'data_preprocessing/labels_store.pkl',
+        partitions_dir=root / 'data_preprocessing/partitions',
+        source_layout='flat',
+        source_star_dir=root / 'data_ingestion/star',
+        incremental=incremental,
+        source_partitions_dir=root / 'data_ingestion/partitions',
+        predict_pipeline=PredictPipelineConfig(model_path=None, compact_model_path=None, preprocessor_path=None, lookup_path=None),
+        n_jobs=1
+    )).initiate_data_preprocessing()
+
+    prepared = pd.read_csv(root / 'data_preprocessing/data.csv')
+    return prepared.sort_values(['order_id', 'review_id', 'product_id']).reset_index(drop=True)
+
+def test_incremental_runs_equal_full_rebuild(tmp_path, stub_predict_pipeline):
+    datasets = build_olist_export()
+    order_ids = datasets['orders'].order_id
+
+    write_olist_export(datasets, tmp_path / 'full_export')
+    full = run_pipeline(tmp_path / 'full', tmp_path / 'full_export', incremental=False)
+    full_scored = list(stub_predict_pipeline.scored)
+
+    # first export has part of the orders, the second one all of them
+    stub_predict_pipeline.scored.clear()
+    write_olist_export(datasets, tmp_path / 'export', order_ids[:70])
+    first = run_pipeline(tmp_path / 'incremental', tmp_path / 'export', incremental=True)
+
+    write_olist_export(datasets, tmp_path / 'export')
+    second = run_pipeline(tmp_path / 'incremental', tmp_path / 'export', incremental=True)
+
+    assert set(first.order_id) == set(order_ids[:70])
+    # the second run appended partitions of its new orders only
+    second_partitions = list((tmp_path / 'incremental/data_ingestion/partitions').rglob('part-00002.csv'))
+    assert second_partitions
+    assert set(pd.concat(pd.read_csv(path) for path in second_partitions).order_id) == set(order_ids[70:])
+    pd.testing.assert_frame_equal(second[full.columns], full)
+    assert set(PREPARED_COLUMNS).issubset(full.columns)
+
+    # each distinct review text is scored once across runs, as in the full rebuild
+    assert sorted(stub_predict_pipeline.scored) == sorted(full_scored)
+
+def test_rerun_without_new_orders_scores_nothing(tmp_path, stub_predict_pipeline):
+    datasets = build_olist_export()
+    write_olist_export(datasets, tmp_path / 'export')
+
+    first = run_pipeline(tmp_path / 'incremental', tmp_path / 'export', incremental=True)
+    partitions = sorted(path.relative_to(tmp_path) for path in (tmp_path / 'incremental').rglob('part-*.csv'))
+    assert len(stub_predict_pipeline.scored) > 0
+
+    stub_predict_pipeline.scored.clear()
+    rerun = run_pipeline(tmp_path / 'incremental', tmp_path / 'export', incremental=True)
+
+    assert stub_predict_pipeline.scored == []
+    assert sorted(path.relative_to(tmp_path) for path in (tmp_path / 'incremental').rglob('part-*.csv')) == partitions
+    pd.testing.assert_frame_equal(rerun, first)
+
+def test_incremental_run_without_orders_writes_empty_prepared_data(tmp_path, stub_predict_pipeline):
+    datasets = build_olist_export()
+    write_olist_export(datasets, tmp_path / 'export', order_ids=[])
+
+    prepared = run_pipeline(tmp_path / 'incremental', tmp_path / 'export', incremental=True)
+
+    assert prepared.empty
+    assert prepared.columns.tolist() == PREPARED_COLUMNS
+    assert stub_predict_pipeline.scored == []
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from src.components.lda.data_ingestion import LDADataIngestion
+from src.entity.config_entity import LDADataIngestionConfig
+from src.utils.common import hash_text
+
+def write_source(source_dir, filename, titles, messages, scores):
+    source_dir.mkdir(exist_ok=True)
+    pd.DataFrame({
+        'review_score': scores,
+        'review_comment_title': titles,
+        'review_comment_message': messages
+    }).to_csv(source_dir / filename, index=False)
+
+def run_ingestion(tmp_path, source_dir, chunk_size=3):
+    config = LDADataIngestionConfig(
+        dest_dir=str(tmp_path / 'dest'),
+        dest_filename='reviews.csv',
+        dest_train_filename='reviews_train.csv',
+        dest_test_filename='reviews_test.csv',
+        source_data_path=source_dir,
+        test_size=0.3,
+        chunk_size=chunk_size
+    )
+    LDADataIngestion(config).initiate_data_ingestion()
+
+    return [
+        set(pd.read_csv(tmp_path / 'dest' / filename, keep_default_na=False).reviews)
+        for filename in ['reviews.csv', 'reviews_train.csv', 'reviews_test.csv']
+    ]
+
+def test_hash_text_is_stable_64_bits():
+    assert hash_text('produto chegou quebrado') == hash_text('produto chegou quebrado')
+    assert hash_text('produto chegou quebrado') != hash_text('produto chegou quebrado.')
+    assert 0 <= hash_text('entrega atrasada') < 2**64
+    # blake2b digest, the same across processes and python versions
+    assert hash_text('') == 13020603013274838756
+
+def test_split_is_unique_and_stable_when_data_is_appended(tmp_path):
+    source_dir = tmp_path / 'source'
+    titles = [f'titulo {i}' for i in range(40)]
+    messages = [f'mensagem {i}' for i in range(40)]
+    scores = [1, 2, 3, 5] * 10
+
+    # duplicated review across chunks and a review with no message
+    write_source(source_dir, 'a.csv', titles + ['titulo 0', 'sem mensagem'], messages + ['mensagem 0', None], scores + [1, 1])
+    reviews, train, test = run_ingestion(tmp_path, source_dir)
+
+    expected = {f'titulo {i}. mensagem {i}' for i in range(40) if scores[i] <= 3}
+    assert reviews == expected
+    assert train | test == expected
+    assert not train & test
+
+    # appended reviews do not move the previous ones to the other split
+    write_source(source_dir, 'b.csv', [f'novo {i}' for i in range(40)], messages, [1] * 40)
+    new_reviews, new_train, new_test = run_ingestion(tmp_path, source_dir, chunk_size=7)
+
+    assert reviews < new_reviews
+    assert train <= new_train
+    assert test <= new_test
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from src.pipeline.lda_inference import TopicLookup, compact_csr, compact_lda_model, fast_lda_transform
+
+THRESHOLD = 0.15
+
+def labels(topics):
+    # complaint labels of PredictPipeline, 2 is inconclusive
+    return np.where(np.abs(topics[:, 0] - topics[:, 1]) <= THRESHOLD, 2, topics.argmax(axis=1))
+
+def test_fast_transform_matches_exact_with_sklearn_tolerance(lda_model, test_vectors):
+    exact = lda_model.transform(test_vectors)
+    fast = fast_lda_transform(lda_model, test_vectors, max_iter=lda_model.max_doc_update_iter, tol=lda_model.mean_change_tol)
+
+    np.testing.assert_allclose(fast, exact, atol=1e-8)
+
+def test_fast_transform_within_tolerance(lda_model, test_vectors):
+    exact = lda_model.transform(test_vectors)
+    fast = fast_lda_transform(lda_model, test_vectors)
+
+    np.testing.assert_allclose(fast.sum(axis=1), 1)
+    np.testing.assert_allclose(fast, exact, atol=1e-2)
+    np.testing.assert_array_equal(labels(fast), labels(exact))
+
+def test_early_stop_keeps_labels(lda_model, test_vectors):
+    exact = lda_model.transform(test_vectors)
+    fast = fast_lda_transform(lda_model, test_vectors, threshold=THRESHOLD, early_stop_margin=0.05)
+
+    np.testing.assert_array_equal(labels(fast), labels(exact))
+
+def test_empty_reviews_keep_uniform_topics(lda_model, test_vectors):
+    empty = test_vectors[:3] * 0
+    empty.eliminate_zeros()
+
+    np.testing.assert_allclose(fast_lda_transform(lda_model, empty), lda_model.transform(empty))
+
+def test_compact_csr_keeps_binary_counts(test_vectors):
+    X = compact_csr(test_vectors)
+
+    assert X.dtype == np.uint8
+    assert X.indices.dtype == X.indptr.dtype == np.int32
+    assert (X != test_vectors).nnz == 0
+
+def test_compact_model_does_not_change_the_model(lda_model):
+    compact_model = compact_lda_model(lda_model, np.float32)
+
+    assert compact_model.components_.dtype == compact_model.exp_dirichlet_component_.dtype == np.float32
+    assert lda_model.components_.dtype == lda_model.exp_dirichlet_component_.dtype == np.float64
+    assert compact_lda_model(compact_model, np.float32) is compact_model
+
+def test_float32_labels_agree_with_float64(lda_model, test_vectors):
+    compact_model = compact_lda_model(lda_model, np.float32)
+    X = compact_csr(test_vectors, np.float32)
+
+    exact = lda_model.transform(test_vectors)
+    exact_float32 = compact_model.transform(X)
+    fast_float32 = fast_lda_transform(compact_model, X)
+
+    assert exact_float32.dtype == fast_float32.dtype == np.float32
+    np.testing.assert_allclose(exact_float32, exact, atol=1e-4)
+    np.testing.assert_array_equal(labels(exact_float32), labels(exact))
+    np.testing.assert_array_equal(labels(fast_float32), labels(fast_lda_transform(lda_model, test_vectors)))
+
+def test_topic_lookup_matches_transform_on_every_single_term_and_pair(lda_model):
+    compact_model = compact_lda_model(lda_model, np.float32)
+    topic_lookup = TopicLookup.build(compact_model, max_terms=2)
+    n_features = lda_model.components_.shape[1]
+
+    singles = sp.identity(n_features, format='csr', dtype=np.uint8)
+    first, second = np.triu_indices(n_features, k=1)
+    # pairs given with their terms in both orders
+    pairs = sp.csr_matrix(
+        (np.ones(2 * first.shape[0], dtype=np.uint8), np.column_stack([second, first]).ravel(), np.arange(0, 2 * first.shape[0] + 1, 2)),
+        shape=(first.shape[0], n_features)
+    )
+
+    for X in [singles, pairs]:
+        topics, found = topic_lookup.lookup(X)
+
+        assert found.all()
+        np.testing.assert_allclose(topics, compact_model.transform(sp.csr_matrix(X, dtype=np.float32)), atol=1e-6)
+
+def test_topic_lookup_misses(lda_model):
+    n_features = lda_model.components_.shape[1]
+    X = sp.csr_matrix(np.array([
+        [1, 1, 1] + [0] * (n_features - 3),  # three terms
+        [2] + [0] * (n_features - 1),  # count above one
+        [1, 2] + [0] * (n_features - 2),  # pair with a count above one
+        [0] * n_features,  # empty
+        [0, 1] + [0] * (n_features - 2)  # single term, found
+    ], dtype=np.uint8))
+
+    topics, found = TopicLookup.build(lda_model, max_terms=2).lookup(X)
+
+    np.testing.assert_array_equal(found, [False, False, False, False, True])
+    assert np.isnan(topics[~found]).all()
+
+    # pairs are misses when the lookup has single terms only
+    _, found = TopicLookup.build(lda_model, max_terms=1).lookup(sp.csr_matrix(X[[2, 4]] > 0, dtype=np.uint8))
+    np.testing.assert_array_equal(found, [False, True])
+
+def test_topic_lookup_of_another_vocabulary_raises(lda_model, test_vectors):
+    topic_lookup = TopicLookup.build(lda_model, max_terms=1)
+
+    with pytest.raises(ValueError):
+        topic_lookup.lookup(test_vectors[:, :-1])
@@ -0,0 +1,126 @@
+import functools
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.decomposition import LatentDirichletAllocation
+
+from src.constants import PARAMETERS_FILE_PATH
+from src.components.lda.model_trainer import LDAModelTrainer, check_lda_internals
+from src.entity.config_entity import LDAModelTrainerConfig
+from src.utils.common import load_object, read_yaml
+
+@pytest.fixture
+def train_data(tmp_path):
+    rng = np.random.default_rng(0)
+    X = (rng.random((120, 30)) < 0.15).astype(np.float64)
+
+    # the checkpoint fingerprint hashes the training data file
+    train_data_path = tmp_path / 'reviews_train.csv'
+    pd.DataFrame({ 'vectors': [str(row.astype(int).tolist()) for row in X] }).to_csv(train_data_path, index=False)
+
+    return X, train_data_path
+
+def make_trainer(dest_dir, train_data_path, evaluate_every=0, perp_tol=0.1, checkpoint_every=0):
+    return LDAModelTrainer(LDAModelTrainerConfig(
+        dest_dir=dest_dir,
+        model_filename='lda_model.pkl',
+        compact_model_filename='lda_model_float32.pkl',
+        lookup_filename='lda_lookup.pkl',
+        checkpoint_filename='lda_checkpoint.pkl',
+        perplexities_filename='lda_perplexities.csv',
+        train_data_path=train_data_path,
+        test_data_path=train_data_path,
+        n_components=2,
+        doc_prior=1.0,
+        word_prior=0.15,
+        max_iter=12,
+        learning_method='batch',
+        batch_size=128,
+        n_jobs=1,
+        evaluate_every=evaluate_every,
+        perp_tol=perp_tol,
+        checkpoint_every=checkpoint_every,
+        lookup_max_terms=2
+    ))
+
+def make_model(learning_method='batch'):
+    return LatentDirichletAllocation(n_components=2, doc_topic_prior=1.0, topic_word_prior=0.15, max_iter=12,
+                                     learning_method=learning_method, batch_size=32, random_state=42)
+
+def test_lda_internals_are_available():
+    check_lda_internals()
+
+@pytest.mark.parametrize('learning_method', ['batch', 'online'])
+def test_fit_model_matches_sklearn_fit(tmp_path, train_data, learning_method):
+    X, train_data_path = train_data
+
+    lda_model, perplexities = make_trainer(tmp_path / 'lda', train_data_path).fit_model(make_model(learning_method), X)
+    expected = make_model(learning_method).fit(X)
+
+    assert perplexities == []
+    assert lda_model.n_iter_ == expected.n_iter_
+    np.testing.assert_allclose(lda_model.components_, expected.components_)
+    assert lda_model.bound_ == pytest.approx(expected.bound_)
+
+def test_resumed_fit_matches_uninterrupted_fit(tmp_path, train_data, monkeypatch):
+    X, train_data_path = train_data
+
+    uninterrupted, uninterrupted_perplexities = make_trainer(tmp_path / 'full', train_data_path, evaluate_every=3, perp_tol=0).fit_model(make_model(), X)
+
+    # interrupt the training at the 7th iteration, after the checkpoint of the 4th
+    em_step = LatentDirichletAllocation._em_step
+    calls = []
+
+    @functools.wraps(em_step)
+    def interrupted_em_step(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 7:
+            raise KeyboardInterrupt
+
+        return em_step(self, *args, **kwargs)
+
+    trainer = make_trainer(tmp_path / 'resume', train_data_path, evaluate_every=3, perp_tol=0, checkpoint_every=4)
+
+    monkeypatch.setattr(LatentDirichletAllocation, '_em_step', interrupted_em_step)
+    with pytest.raises(KeyboardInterrupt):
+        trainer.fit_model(make_model(), X)
+    monkeypatch.undo()
+
+    assert load_object(tmp_path / 'resume' / 'lda_checkpoint.pkl')['model'].n_iter_ == 4
+
+    resumed, resumed_perplexities = trainer.fit_model(make_model(), X)
+
+    assert resumed.n_iter_ == uninterrupted.n_iter_ == 12
+    np.testing.assert_allclose(resumed.components_, uninterrupted.components_)
+    assert resumed_perplexities == pytest.approx(uninterrupted_perplexities)
+
+def test_checkpoint_of_other_parameters_is_ignored(tmp_path, train_data):
+    X, train_data_path = train_data
+    trainer = make_trainer(tmp_path / 'lda', train_data_path, checkpoint_every=4)
+
+    trainer.fit_model(make_model(), X)
+
+    # the checkpoint of the 8th iteration has another max_iter, the training starts over
+    other_model = make_model().set_params(max_iter=5)
+    lda_model, _ = trainer.fit_model(other_model, X)
+
+    assert lda_model.n_iter_ == 5
+    np.testing.assert_allclose(lda_model.components_, make_model().set_params(max_iter=5).fit(X).components_)
+
+def test_fit_model_stops_on_converged_perplexity(tmp_path, train_data):
+    X, train_data_path = train_data
+
+    lda_model, perplexities = make_trainer(tmp_path / 'lda', train_data_path, evaluate_every=2, perp_tol=1e6).fit_model(make_model(), X)
+
+    # the second evaluation changes less than perp_tol
+    assert [iteration for iteration, _ in perplexities] == [2, 4]
+    assert lda_model.n_iter_ == 4
+    assert lda_model.bound_ == perplexities[-1][1]
+
+def test_default_params_train_a_plain_fit():
+    # the shipped topic to complaint mapping of label_topics holds for a plain max_iter fit
+    params = read_yaml(PARAMETERS_FILE_PATH).lda_model_params
+
+    assert params.evaluate_every == 0
+    assert params.checkpoint_every == 0
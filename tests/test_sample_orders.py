@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from olist_export import build_olist_export
+from src.components.data_ingestion import DataIngestion
+from src.entity.config_entity import DataIngestionConfig
+
+def sample(datasets, fraction, max_orders, seed=42):
+    ingestion = DataIngestion(DataIngestionConfig(
+        source_dir=None, dest_dir=None, dest_filename=None, layout='flat', star_dir=None,
+        incremental=False, partitions_dir=None, state_filename=None,
+        sample_fraction=fraction, sample_max_orders=max_orders, sample_seed=seed
+    ))
+
+    return ingestion.sample_orders(datasets['orders'], datasets['order_reviews'])
+
+def strata(datasets, orders):
+    # purchase month and score of the first review of each order
+    scores = datasets['order_reviews'].drop_duplicates(subset=['order_id']).set_index('order_id').review_score
+    return orders.order_purchase_timestamp.str[:7] + '/' + orders.order_id.map(scores).fillna(0).astype(str)
+
+@pytest.fixture(scope='module')
+def datasets():
+    return build_olist_export(n_orders=1000, seed=1)
+
+@pytest.mark.parametrize('fraction, max_orders, size', [
+    (0.3, None, 300),
+    (0.05, None, 50),
+    (None, 123, 123),
+    (0.5, 123, 123),
+    (0.1, 500, 100),
+    (None, None, 1000),
+    (0, None, 0),
+    (None, 0, 0),
+    (0.5, 0, 0)
+])
+def test_sample_size_and_strata_shares(datasets, fraction, max_orders, size):
+    orders = datasets['orders']
+    sampled = sample(datasets, fraction, max_orders)
+
+    assert sampled.shape[0] == size
+    assert sampled.order_id.is_unique
+    # source order is kept
+    assert sampled.index.is_monotonic_increasing
+
+    full_counts = strata(datasets, orders).value_counts()
+    sample_counts = strata(datasets, sampled).value_counts().reindex(full_counts.index, fill_value=0)
+
+    # each stratum is within one order of its share of the sample
+    expected = full_counts * size / orders.shape[0]
+    assert (np.abs(sample_counts - expected) <= 1).all()
+
+def test_sample_is_deterministic_by_seed(datasets):
+    first = sample(datasets, 0.2, None)
+
+    pd.testing.assert_frame_equal(sample(datasets, 0.2, None), first)
+    assert sample(datasets, 0.2, None, seed=7).order_id.tolist() != first.order_id.tolist()
@@ -0,0 +1,43 @@
+import numpy as np
+
+from src.components.lda.data_transformation import TextVectorizer, TokenizedDocs
+
+# preprocessed reviews, as TextPreprocessing outputs them
+TEXTS = [
+    'produto chegou quebrado',
+    'entrega atrasada produto',
+    'não recebi produto entrega',
+    'produto ótimo entrega rápida',
+    '',
+    'chegou atrasada',
+    'recebi produto errado',
+    'produto não chegou'
+]
+
+def tokenize(texts):
+    vocabulary = sorted({word for text in texts for word in text.split()})
+    word_ids = {word: i for i, word in enumerate(vocabulary)}
+
+    ids = [word_ids[word] for text in texts for word in text.split()]
+    offsets = np.concatenate([[0], np.cumsum([len(text.split()) for text in texts])])
+
+    return TokenizedDocs(offsets, ids, vocabulary)
+
+def test_tokenized_docs_round_trip():
+    assert tokenize(TEXTS).to_texts() == TEXTS
+
+def test_token_path_matches_text_path():
+    vectorizer = TextVectorizer(max_ngram=2, max_df=1.0, min_df=0.0, max_features=None).fit(TEXTS)
+
+    from_texts = vectorizer.transform(TEXTS)
+    from_tokens = vectorizer.transform(tokenize(TEXTS))
+
+    assert from_tokens.dtype == from_texts.dtype == np.uint8
+    assert from_tokens.shape == from_texts.shape
+    assert (from_tokens != from_texts).nnz == 0
+
+def test_token_path_with_unseen_words():
+    vectorizer = TextVectorizer(max_ngram=2, max_df=1.0, min_df=0.0, max_features=5).fit(tokenize(TEXTS))
+    texts = ['produto novo chegou quebrado', 'palavra desconhecida']
+
+    assert (vectorizer.transform(tokenize(texts)) != vectorizer.transform(texts)).nnz == 0